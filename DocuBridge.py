@@ -1,23 +1,62 @@
 import os
+import sys
+import glob
+import argparse
 import threading
+import importlib
 import datetime
 import re
 import time
 import random
 import json
+import sqlite3
+import hashlib
+import copy
+import unicodedata
 import webbrowser
 import platform
 import subprocess
-import tkinter as tk
-from tkinter import filedialog, messagebox, ttk, scrolledtext
-import requests
 import atexit
+import itertools
+import multiprocessing
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 
-from packaging import version
-from docx import Document
-from docx.shared import RGBColor, Pt
-import translators as ts
-from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+# tkinter는 GUI 실행 시에만 로드 (headless CLI는 tkinter 없이 동작)
+tk = filedialog = messagebox = ttk = scrolledtext = None
+
+def load_tkinter():
+    global tk, filedialog, messagebox, ttk, scrolledtext
+    import tkinter as tk
+    from tkinter import filedialog, messagebox, ttk, scrolledtext
+
+class LazyModule:
+    # 첫 속성 접근 시 import - translators(네트워크 접근 포함) / docx / requests가 시작 시간을 잡아먹지 않도록
+    def __init__(self, name):
+        self.name = name
+        self.module = None
+
+    def load(self):
+        if self.module is None: self.module = importlib.import_module(self.name)
+        return self.module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+ts = LazyModule("translators")
+docx = LazyModule("docx")
+docx_oxml = LazyModule("docx.oxml")
+docx_opc_oxml = LazyModule("docx.opc.oxml")
+lxml_etree = LazyModule("lxml.etree")
+requests = LazyModule("requests")
+asyncio = LazyModule("asyncio")  # async 모드에서만 필요
+version = LazyModule("packaging.version")
+
+def preload_modules():
+    # GUI가 뜬 뒤 백그라운드에서 미리 로드 -> 번역 시작 시 import 대기 없음
+    for module in (docx, lxml_etree, requests, ts):
+        try: module.load()
+        except Exception: pass
 
 # ===== [Settings] =====
 APP_NAME = "DocuBridge"
@@ -32,6 +71,34 @@ MOCK_TEST = False
 APPEND_COLOR = (128, 128, 128)
 # Hybrid 모드에서는 Online이 빠르므로 4로 유지하되, Local 사용 시 내부 Lock으로 제어됨
 MAX_WORKERS = 4 
+# 엔진별 1회 요청 최대 글자 수 (배치 요청 시 이 한도 안에서 묶음)
+ENGINE_CHAR_LIMITS = {'google': 5000, 'bing': 1000, 'alibaba': 3000}
+OLLAMA_BATCH_MAX_CHARS = 1200
+# Ollama 생성 한도: 입력 길이에 맞춰 num_predict / num_ctx 산정
+OLLAMA_MIN_PREDICT = 128
+OLLAMA_MAX_PREDICT = 4096
+OLLAMA_MIN_CTX = 2048
+OLLAMA_MAX_CTX = 16384
+# 고정 system 프롬프트 - 매 요청 동일한 접두부라 서버의 프롬프트 캐시를 재사용
+OLLAMA_SYSTEM_PROMPT = "You are a translator. Translate the user's Korean text to English. Output ONLY the translated text without any explanation."
+OLLAMA_BATCH_SYSTEM_PROMPT = ("You are a translator. The user sends a JSON array of Korean strings. "
+                              "Reply with a JSON object {\"translations\": [...]} containing one English translation per input string, in the same order.")
+# AIMD 속도 제한: 성공 시 가산 증가, 오류/타임아웃 시 절반으로 감소
+RATE_LIMIT_DEFAULT = {"rate": 5.0, "window": 4.0}  # 초당 요청 수 / 동시 요청 수
+RATE_LIMIT_BOUNDS = {"rate": (0.2, 50.0), "window": (1.0, 32.0)}
+RATE_LIMIT_INCREASE = 1.0  # 성공 window 1회분(window개 성공)마다 rate +1 (요청당 1/window)
+# 속도를 줄이는 건 throttling 신호일 때만 (타임아웃, 429 / 503, rate limit 메시지) - 내용 오류/빈 응답은 제외
+THROTTLE_PATTERN = re.compile(r"\b429\b|\b503\b|too many requests|rate.?limit|quota", re.I)
+RATE_LIMIT_WAIT = 10  # 슬롯 대기 최대 시간(초) - 초과 시 다음 엔진으로
+RATE_LIMIT_DECAY = 0.25  # 다음 실행은 학습값에서 기본값 쪽으로 25% 당겨서 시작 (지난 실행의 값에 영구히 묶이지 않도록)
+# 엔진 상태 기반 라우팅 / Circuit Breaker
+HEALTH_EWMA_ALPHA = 0.2
+BREAKER_FAILURE_THRESHOLD = 3        # 연속 실패 N회 -> OPEN
+BREAKER_COOLDOWN = (5.0, 60.0)       # OPEN 유지 시간 (초기값, 최대값) - half-open 실패 시 2배
+DEGRADED_LATENCY = 4.0               # 가장 빠른 온라인 엔진의 EWMA 지연이 이 이상이면 Local로 부하 이동
+DEADLINE_MIN_TIMEOUT = (1.5, 0.25)   # 시간 예산이 줄어도 호출 타임아웃은 max(1.5초, 기본 타임아웃의 25%) 이상
+HEDGE_MIN_SAMPLES = 10               # 지연 분포를 신뢰하기 위한 최소 표본 수
+RECOVERY_BACKOFF = (0.5, 30.0)       # 복구 재시도 엔진별 대기 (초기값, 최대값) - 연속 실패마다 2배 + jitter
 
 HAN_TO_ENG_MAP = {
     '가': 'A', '나': 'B', '다': 'C', '라': 'D', '마': 'E', '바': 'F', '사': 'G',
@@ -51,9 +118,50 @@ class ConfigManager:
             "theme": "light",
             "debug_mode": False,
             "backend_priority": "online",  # 'online' or 'local'
-            "ollama_model": "qwen2.5:1.5b" # Default AI Model
+            "ollama_model": "qwen2.5:1.5b", # Default AI Model
+            "ollama_num_parallel": 0,      # Ollama 동시 요청 슬롯 수 (0 = OLLAMA_NUM_PARALLEL 환경변수에서 감지, 없으면 1)
+            "ollama_url": "http://localhost:11434",
+            "ollama_keep_alive": "30m",    # 파일 사이에 모델이 내려가지 않도록 유지
+            "tm_enabled": True,            # 번역 메모리 (파일/실행 간 공유)
+            "tm_path": "translation_memory.db",
+            "tm_max_entries": 50000,
+            "batch_enabled": True,         # 짧은 문단 여러 개를 1회 요청으로 묶음
+            "batch_max_segments": 20,
+            "batch_segment_max_chars": 200,
+            "execution_mode": "thread",    # 'thread' or 'async' (aiohttp 필요)
+            "async_concurrency": 64,
+            "learned_rate_limits": {},     # 엔진별 학습된 rate/window (실행 간 유지)
+            "document_deadline_sec": 0,    # 문서당 시간 예산 - 줄어들수록 호출 타임아웃 단축 (0 = 무제한)
+            "hedge_enabled": True,         # p90 지연 안에 응답이 없으면 다른 엔진에 중복 요청
+            "hedge_percentile": 0.9,
+            "hedge_max_ratio": 0.1,        # 중복 요청은 전체 요청의 10%까지만
+            "pipeline_max_pending": 64,    # 동시에 제출해 둘 작업 수 (메모리 상한)
+            "max_open_documents": 2,       # 여러 파일 처리 시 동시에 열어 둘 문서 수
+            "journal_enabled": True,       # 파일별 진행 기록 -> 중단된 문서를 이어서 처리
+            "metrics_json": False,         # 파일별 metrics_<파일명>.json 저장
+            "metrics_prom_path": "",       # Prometheus textfile 경로 (빈 값이면 끔)
+            "metrics_port": 0,             # 127.0.0.1:<port>/metrics (0이면 끔)
+            "profile_mode": False,         # 파일별 cProfile / tracemalloc / 스레드 샘플링 (CLI --profile, GUI Profile 체크박스)
+            "profile_top_n": 25,
+            "profile_sample_interval": 0.01,
+            "save_passthrough": True,      # 저장 시 바뀐 XML 파트만 다시 쓰고 이미지 등은 압축된 그대로 복사
+            "chunk_max_chars": 500,        # 이보다 긴 문단은 문장 단위 조각으로 나눠 동시에 번역 (0 = 끔)
+            "glossary_path": "glossary.txt", # 용어집: 한 줄에 "원문<Tab>번역" 또는 "원문 = 번역" (# 주석)
+            "health_cache_ttl_sec": 600,   # 엔진 상태 확인 결과 재사용 시간 / 번역 중 백그라운드 재확인 주기 (0 = 매번 확인)
+            "engine_health_cache": {},
+            "document_mode": "thread",     # 'process': 문서 열기/추출, write-back/저장을 프로세스 풀에서 (여러 파일일 때 번역과 겹침)
+            "document_processes": 0,       # process 모드 프로세스 수 (0 = CPU 코어 수)
+            "ui_refresh_ms": 66,           # GUI 진행률/로그 반영 주기 (~15Hz)
+            "log_max_lines": 5000,         # 로그 창에 남길 최대 줄 수 (오래된 줄부터 삭제)
+            "recovery_workers": 8,         # 실패한 문단을 동시에 복구할 스레드 수
+            "recovery_max_attempts": 4,    # 문단당 복구 시도 횟수
+            "retry_budget_ratio": 0.5,     # 실패한 복구 요청은 전체 작업 수의 50%까지 (throttling 중 재시도 폭주 방지)
+            "retry_budget_min": 50,        # 작업 수가 적을 때의 최소 예산
+            "retry_budget_refill_per_sec": 1.0  # 예산이 바닥난 뒤에도 초당 이만큼 다시 채워짐 (0 = 채우지 않음)
         }
         self.data = self.load()
+        self.overrides = {}  # CLI 옵션 등 이번 실행에만 적용 - get은 우선 읽지만 save는 쓰지 않음
+        self.lock = threading.RLock()  # 백그라운드 상태 확인 / 속도 제한 저장이 동시에 쓸 수 있음 (set -> save 재진입)
         atexit.register(self.save)
 
     def load(self):
@@ -66,18 +174,28 @@ class ConfigManager:
             return self.defaults.copy()
 
     def save(self):
+        # process 모드 자식 프로세스(spawn)도 모듈을 다시 import해 자기 사본을 가짐 -> 종료 시 부모가 쓴 값을 덮어쓰지 않도록
+        if multiprocessing.parent_process() is not None: return
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=4, ensure_ascii=False)
+            with self.lock:
+                # 호출자가 넘긴 dict/list가 나중에 바뀌어도 직렬화 중에 깨지지 않도록 사본을 씀
+                data = copy.deepcopy(self.data)
+                with open(self.config_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=4, ensure_ascii=False)
         except Exception as e:
-            print(f"Config save failed: {e}")
+            print(f"Config save failed: {e}", file=sys.stderr)
 
     def get(self, key, default=None):
+        if key in self.overrides: return self.overrides[key]
         return self.data.get(key, self.defaults.get(key, default))
 
+    def override(self, key, value):
+        self.overrides[key] = value
+
     def set(self, key, value):
-        self.data[key] = value
-        self.save()
+        with self.lock:
+            self.data[key] = value
+            self.save()
 
 config = ConfigManager()
 
@@ -108,6 +226,7 @@ class ToolTip:
 class LifecycleManager:
     def __init__(self):
         self.tracking_table = {} 
+        self.counters = {}
         self.lock = threading.Lock()
     def register(self, task_id, original_text):
         with self.lock: self.tracking_table[task_id] = {"status": "READY", "result": None, "orig": original_text}
@@ -115,22 +234,49 @@ class LifecycleManager:
         with self.lock:
             self.tracking_table[task_id]["status"] = status
             if result: self.tracking_table[task_id]["result"] = result
+    def get(self, task_id):
+        with self.lock: return dict(self.tracking_table.get(task_id) or {})
+    def register_chunks(self, task_id, separators, chunks):
+        # 긴 문단의 조각: "<id>.<n>" 으로 따로 추적 (summary에는 원래 문단만 집계)
+        chunk_ids = [f"{task_id}.{k}" for k in range(1, len(chunks) + 1)]
+        with self.lock:
+            for chunk_id, text in zip(chunk_ids, chunks):
+                self.tracking_table[chunk_id] = {"status": "READY", "result": None, "orig": text, "parent": task_id}
+            self.tracking_table[task_id].update(status="IN_PROGRESS", chunks=chunk_ids, separators=separators, done=0)
+        return chunk_ids
+    def complete_chunk(self, chunk_id):
+        # 조각 하나가 끝남 (성공 / 최종 실패) -> 마지막 조각이면 순서대로 이어 붙여 원래 문단 상태 확정, True 반환
+        with self.lock:
+            parent = self.tracking_table[self.tracking_table[chunk_id]["parent"]]
+            parent["done"] += 1
+            if parent["done"] < len(parent["chunks"]): return False
+            # 번역이 필요 없던 조각(영문 문장 등)은 원문 그대로 이어 붙임
+            chunks = [self.tracking_table[c] for c in parent["chunks"]]
+            results = [c["orig"] if c["status"] == "SKIPPED" else c["result"] for c in chunks]
+            if all(c["status"] in ("SUCCESS", "SKIPPED") for c in chunks) and all(results):
+                parent["status"] = "SUCCESS"
+                parent["result"] = "".join(sep + r for sep, r in zip(parent["separators"], results))
+            else: parent["status"] = "FAILED"
+            return True
     def get_failed_tasks(self):
         failed = []
         with self.lock:
             for tid, info in self.tracking_table.items():
-                if info["status"] == "FAILED": failed.append((tid, info["orig"]))
+                if info["status"] == "FAILED" and "parent" not in info: failed.append((tid, info["orig"]))
         return failed
+    def count(self, key, n=1):
+        # 상태와 별개인 부가 카운터 (TM hit/miss 등)
+        with self.lock: self.counters[key] = self.counters.get(key, 0) + n
     def get_summary(self):
         summary = {"SUCCESS": 0, "SKIPPED": 0, "FAILED": 0, "READY": 0, "IN_PROGRESS": 0}
         with self.lock:
             for info in self.tracking_table.values():
+                if "parent" in info: continue
                 s = info["status"]
                 summary[s] = summary.get(s, 0) + 1
+            summary.update(self.counters)
         return summary
 
-lifecycle_manager = LifecycleManager()
-
 class UpdateManager:
     def __init__(self, app_instance):
         self.app = app_instance
@@ -165,7 +311,7 @@ def open_file_safe(path):
         if platform.system() == 'Windows': os.startfile(path)
         elif platform.system() == 'Darwin': subprocess.call(('open', path))
         else: subprocess.call(('xdg-open', path))
-    except Exception as e: print(f"Error opening file: {e}")
+    except Exception as e: print(f"Error opening file: {e}", file=sys.stderr)
 
 def is_korean_present(text): return any('\uac00' <= c <= '\ud7a3' for c in text)
 
@@ -183,90 +329,971 @@ class FileLogger:
     def __init__(self, filename):
         self.filename = filename
         self.logs = []
+        self.notes = []
         self.lock = threading.Lock()
     def add(self, task_id, status, engine, original, translated):
         with self.lock: self.logs.append({'id': task_id, 'status': status, 'engine': engine, 'orig': original.strip(), 'trans': str(translated).strip()})
+    def add_note(self, text):
+        # 작업 단위가 아닌 파일 단위 정보 (엔진 속도 제한 등) - 로그 끝에 기록
+        with self.lock: self.notes.append(text)
+    @staticmethod
+    def id_label(task_id):
+        # 긴 문단의 조각은 "<id>.<n>" (예: 012.3)
+        parent, _, chunk = str(task_id).partition(".")
+        return f"{int(parent):03d}.{chunk}" if chunk else f"{int(parent):03d}"
     def save(self):
-        self.logs.sort(key=lambda x: x['id'])
+        self.logs.sort(key=lambda x: tuple(int(n) for n in str(x['id']).split(".")))
         with open(self.filename, 'w', encoding='utf-8') as f:
             f.write(f"=== {APP_NAME} Log ({datetime.datetime.now()}) ===\n\n")
-            for log in self.logs: f.write(f"[{log['id']:03d}] [{log['status']}] [{log['engine']}]\nORIGIN: {log['orig']}\nTRANS : {log['trans']}\n{'-'*60}\n")
+            for log in self.logs: f.write(f"[{self.id_label(log['id'])}] [{log['status']}] [{log['engine']}]\nORIGIN: {log['orig']}\nTRANS : {log['trans']}\n{'-'*60}\n")
+            if self.notes:
+                f.write("\n=== Notes ===\n")
+                for note in self.notes: f.write(f"{note}\n")
         return self.filename
 
+class TaskJournal:
+    # 입력 파일별 append-only 기록 (journal_<파일명>.jsonl): 완료된 문단의 결과를 한 줄씩 추가
+    # 재실행 시 원문 해시로 매칭 -> 문단 순서가 바뀌거나 일부가 수정되어도 나머지는 그대로 재사용
+    FSYNC_EVERY = 64
+
+    def __init__(self, path):
+        self.path = path
+        self.previous = {}  # 지난 실행 기록 (조회용)
+        self.done = {}      # 이미 기록된 항목 (중복 기록 방지)
+        self.file = None
+        self.unsynced = 0
+
+    @staticmethod
+    def key(text):
+        return hashlib.sha1(" ".join(unicodedata.normalize("NFC", text).split()).encode("utf-8")).hexdigest()
+
+    def load(self):
+        if not os.path.exists(self.path): return 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try: entry = json.loads(line)
+                except ValueError: continue  # 기록 도중 중단된 마지막 줄
+                self.previous[entry["hash"]] = entry["result"]
+        self.done.update(self.previous)
+        return len(self.previous)
+
+    def lookup(self, text):
+        return self.previous.get(self.key(text))
+
+    def record(self, text, result):
+        h = self.key(text)
+        if self.done.get(h) == result: return
+        self.done[h] = result
+        if self.file is None: self.file = open(self.path, 'a', encoding='utf-8')
+        self.file.write(json.dumps({"hash": h, "result": result}, ensure_ascii=False) + "\n")
+        self.file.flush()
+        self.unsynced += 1
+        if self.unsynced >= self.FSYNC_EVERY: self.sync()
+
+    def sync(self):
+        if self.file and self.unsynced:
+            os.fsync(self.file.fileno())
+            self.unsynced = 0
+
+    def close(self, remove=False):
+        if self.file:
+            self.sync()
+            self.file.close()
+            self.file = None
+        if remove and os.path.exists(self.path): os.remove(self.path)
+
+# ===== [Helper(Translation Memory)] =====
+# 파일/실행 간 공유되는 SQLite 번역 메모리
+# Key: (정규화된 원문, 엔진) - 엔진은 'google' / 'bing' / 'alibaba' / 'ollama:<model>'
+# max_entries 초과 시 last_used 기준 LRU eviction
+class TranslationMemory:
+    def __init__(self, db_path, max_entries=50000, enabled=True):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.conn = None
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def _connect(self):
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS tm (
+                src TEXT NOT NULL, engine TEXT NOT NULL, result TEXT NOT NULL,
+                last_used REAL NOT NULL, PRIMARY KEY (src, engine))""")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS tm_last_used ON tm (last_used)")
+            self.conn.commit()
+            self.size = self.conn.execute("SELECT COUNT(*) FROM tm").fetchone()[0]
+        return self.conn
+
+    @staticmethod
+    def normalize(text):
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    def lookup(self, text, engines):
+        if not self.enabled or not engines: return None, None
+        src = self.normalize(text)
+        marks = ",".join("?" * len(engines))
+        try:
+            with self.lock:
+                conn = self._connect()
+                row = conn.execute(f"SELECT result, engine FROM tm WHERE src = ? AND engine IN ({marks}) "
+                                   "ORDER BY last_used DESC LIMIT 1", (src, *engines)).fetchone()
+                if not row: return None, None
+                conn.execute("UPDATE tm SET last_used = ? WHERE src = ? AND engine = ?", (time.time(), src, row[1]))
+                conn.commit()
+                return row
+        except sqlite3.Error as e:
+            print(f"TM lookup failed: {e}", file=sys.stderr)
+            return None, None
+
+    def store(self, text, engine, result):
+        if not self.enabled or not engine or not result: return
+        src = self.normalize(text)
+        try:
+            with self.lock:
+                conn = self._connect()
+                exists = conn.execute("SELECT 1 FROM tm WHERE src = ? AND engine = ?", (src, engine)).fetchone()
+                conn.execute("INSERT OR REPLACE INTO tm (src, engine, result, last_used) VALUES (?, ?, ?, ?)",
+                             (src, engine, result, time.time()))
+                if not exists: self.size += 1
+                if self.size > self.max_entries:
+                    # 10% 여유분까지 한 번에 비워서 매 삽입마다 eviction이 돌지 않도록 함
+                    excess = self.size - int(self.max_entries * 0.9)
+                    conn.execute("DELETE FROM tm WHERE rowid IN (SELECT rowid FROM tm ORDER BY last_used ASC LIMIT ?)", (excess,))
+                    self.size -= excess
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"TM store failed: {e}", file=sys.stderr)
+
+    def invalidate(self, engine=None, model=None):
+        # 특정 온라인 엔진 / Ollama 모델 항목만 삭제 (인자 없으면 전체 삭제)
+        if model: engine = f"ollama:{model}"
+        with self.lock:
+            conn = self._connect()
+            if engine: cur = conn.execute("DELETE FROM tm WHERE engine = ?", (engine,))
+            else: cur = conn.execute("DELETE FROM tm")
+            conn.commit()
+            self.size = conn.execute("SELECT COUNT(*) FROM tm").fetchone()[0]
+            return cur.rowcount
+
+translation_memory = TranslationMemory(config.get("tm_path"), config.get("tm_max_entries"), config.get("tm_enabled"))
+
+# ===== [Logic - Glossary] =====
+# 고정 번역 용어 (기본 "기타" -> "Etc" + 사용자 glossary.txt)를 Aho-Corasick으로 한 번에 찾음
+# - 용어만으로 이루어진 문단(남는 부분에 한글 없음)은 요청 없이 바로 번역
+# - 긴 문단 안의 용어는 {{n}} 자리표시자로 보호하고 번역 후 되돌림 (사용자 용어만, 기본 용어는 문단 전체 일치일 때만)
+GLOSSARY_DEFAULTS = {"기타": "Etc"}
+# 용어 뒤에 붙어도 되는 조사 (그 외 한글이 이어지면 다른 단어의 일부로 보고 무시: 기타리스트)
+GLOSSARY_PARTICLE_RE = re.compile(r"(?:으로|에서|에게|까지|부터|은|는|이|가|을|를|의|에|와|과|로|도|만)(?![가-힣])")
+GLOSSARY_PLACEHOLDER_RE = re.compile(r"\{\{\s*(\d+)\s*\}\}")
+
+class Glossary:
+    def __init__(self, path):
+        self.path = path
+        self.terms = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        terms = dict(GLOSSARY_DEFAULTS)
+        builtin = set(GLOSSARY_DEFAULTS)
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, encoding="utf-8-sig") as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line or line.startswith("#"): continue
+                        src, sep, dst = line.partition("\t") if "\t" in line else line.partition("=")
+                        if not (sep and src.strip() and dst.strip()): continue
+                        src = unicodedata.normalize("NFC", src.strip())
+                        terms[src] = dst.strip()
+                        builtin.discard(src)
+            except OSError as e: print(f"Glossary load failed: {e}", file=sys.stderr)
+        # trie + failure link: goto[node][char] -> node, outputs[node] = 그 노드에서 끝나는 용어들
+        goto, fail, outputs = [{}], [0], [[]]
+        for term in terms:
+            node = 0
+            for ch in term:
+                if ch not in goto[node]:
+                    goto.append({}); fail.append(0); outputs.append([])
+                    goto[node][ch] = len(goto) - 1
+                node = goto[node][ch]
+            outputs[node].append(term)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                queue.append(child)
+                f = fail[node]
+                while f and ch not in goto[f]: f = fail[f]
+                fail[child] = goto[f].get(ch, 0)
+                outputs[child] = outputs[child] + outputs[fail[child]]
+        self.goto, self.fail, self.outputs = goto, fail, outputs
+        self.terms, self.builtin = terms, builtin
+        return len(terms)
+
+    def ensure_loaded(self):
+        if self.terms is None:
+            with self.lock:
+                if self.terms is None: self.load()
+
+    def find(self, text):
+        # 겹치지 않는 용어 위치 [(start, end, term)] - 왼쪽부터, 같은 위치면 긴 용어 우선
+        self.ensure_loaded()
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        found, node = [], 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]: node = fail[node]
+            node = goto[node].get(ch, 0)
+            for term in outputs[node]: found.append((i + 1 - len(term), i + 1, term))
+        matches, last_end = [], 0
+        for start, end, term in sorted(found, key=lambda m: (m[0], m[0] - m[1])):
+            if start < last_end: continue
+            if start and re.match(r"[가-힣A-Za-z0-9]", text[start - 1]): continue
+            if end < len(text) and re.match(r"[가-힣]", text[end]) and not GLOSSARY_PARTICLE_RE.match(text, end): continue
+            matches.append((start, end, term))
+            last_end = end
+        return matches
+
+    def translate_local(self, text):
+        # 용어를 바꾸고 나서 한글이 남지 않으면 (번호/기호/영문만 남으면) 그 결과를 그대로 사용
+        matches = self.find(text)
+        if len(matches) > 1: matches = [m for m in matches if m[2] not in self.builtin]
+        if not matches: return None
+        if is_korean_present(self.replace(text, matches, lambda i, term: " ")): return None
+        return self.replace(text, matches, lambda i, term: self.terms[term])
+
+    def inline_matches(self, text):
+        # 문장 안에서 보호할 용어 ("기타 비용" -> "Etc costs"가 되지 않도록 기본 용어는 제외)
+        return [m for m in self.find(text) if m[2] not in self.builtin]
+
+    def protect(self, text):
+        # -> (자리표시자로 바꾼 문장, 용어 번역 목록)
+        matches = self.inline_matches(text)
+        if not matches: return text, []
+        return self.replace(text, matches, lambda i, term: f"{{{{{i}}}}}"), [self.terms[term] for _, _, term in matches]
+
+    def tm_key(self, text):
+        # 용어가 들어 있는 문장은 적용된 용어 번역까지 TM 키에 넣음 (용어집이 바뀌면 예전 번역을 쓰지 않도록)
+        matches = self.inline_matches(text)
+        if not matches: return text
+        terms = "\n".join(f"{term}={self.terms[term]}" for _, _, term in matches)
+        return f"{text}\x00glossary:{hashlib.sha1(terms.encode('utf-8')).hexdigest()[:12]}"
+
+    @staticmethod
+    def restore(result, protected):
+        # 자리표시자가 하나라도 빠지거나 바뀌면 None (용어 보호 실패 -> 일반 실패로 처리)
+        if not protected or not result: return result
+        if sorted(int(n) for n in GLOSSARY_PLACEHOLDER_RE.findall(result)) != list(range(len(protected))): return None
+        return GLOSSARY_PLACEHOLDER_RE.sub(lambda m: protected[int(m.group(1))], result)
+
+    @staticmethod
+    def replace(text, matches, value):
+        out, pos = [], 0
+        for i, (start, end, term) in enumerate(matches):
+            out.append(text[pos:start])
+            out.append(value(i, term))
+            pos = end
+        out.append(text[pos:])
+        return "".join(out)
+
+glossary = Glossary(config.get("glossary_path"))
+
+# ===== [Logic - Batching] =====
+# 짧은 세그먼트 여러 개를 번호 목록으로 묶어 1회 요청으로 보내고, 응답을 다시 세그먼트별로 분리
+BATCH_MARKER_RE = re.compile(r"^\s*[\[［【]\s*(\d+)\s*[\]］】]\s?(.*)$")
+
+def pack_segments(texts, max_chars, max_count):
+    # 순서를 유지하며 글자 수 / 개수 한도 안에서 인덱스 그룹으로 묶음
+    groups, current, size = [], [], 0
+    for i, text in enumerate(texts):
+        cost = len(text) + 8  # 번호 마커 + 개행
+        if current and (size + cost > max_chars or len(current) >= max_count):
+            groups.append(current)
+            current, size = [], 0
+        current.append(i)
+        size += cost
+    if current: groups.append(current)
+    return groups
+
+def encode_numbered(texts):
+    return "\n".join(f"[{i}] {t}" for i, t in enumerate(texts, 1))
+
+def decode_numbered(text, count):
+    if not isinstance(text, str): return None
+    parts, current = {}, None
+    for line in text.splitlines():
+        match = BATCH_MARKER_RE.match(line)
+        if match:
+            current = int(match.group(1))
+            if current in parts: return None
+            parts[current] = match.group(2).strip()
+        elif current is not None and line.strip():
+            # 엔진이 한 세그먼트를 여러 줄로 나눈 경우 이어 붙임
+            parts[current] = f"{parts[current]} {line.strip()}"
+    if sorted(parts) != list(range(1, count + 1)): return None
+    return [parts[i] for i in range(1, count + 1)]
+
+def decode_json_list(text, count):
+    try: data = json.loads(text)
+    except (TypeError, ValueError): return None
+    if isinstance(data, dict): data = data.get("translations")
+    if not isinstance(data, list) or len(data) != count: return None
+    if not all(isinstance(item, str) for item in data): return None
+    return [item.strip() for item in data]
+
+# ===== [Logic - Rate Limiting & Engine Health] =====
+# 엔진별 token bucket + 동시 요청 window. AIMD로 조절:
+# 성공 -> rate/window 가산 증가, 오류/타임아웃 -> 절반 감소 (1초에 한 번만 감소해서 버스트 실패에 과잉 반응하지 않음)
+class AdaptiveRateLimiter:
+    def __init__(self, rate, window):
+        self.rate = rate
+        self.window = window
+        self.tokens = 1.0
+        self.in_flight = 0
+        self.last_refill = time.monotonic()
+        self.last_decrease = 0.0
+        self.cond = threading.Condition()
+
+    def _refill(self, now):
+        self.tokens = min(max(1.0, self.window), self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def acquire(self, timeout=RATE_LIMIT_WAIT):
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1 and self.in_flight < int(self.window):
+                    self.tokens -= 1
+                    self.in_flight += 1
+                    return True
+                remaining = deadline - now
+                if remaining <= 0: return False
+                wait_time = (1 - self.tokens) / self.rate if self.tokens < 1 else remaining
+                self.cond.wait(min(max(wait_time, 0.01), remaining))
+
+    def has_capacity(self):
+        with self.cond: return self.in_flight < int(self.window)
+
+    def release(self, success, throttled=False):
+        # success=None: 요청을 보내지 않고 슬롯만 반납 / 실패는 throttled일 때만 절반으로
+        with self.cond:
+            self.in_flight -= 1
+            lo_rate, hi_rate = RATE_LIMIT_BOUNDS["rate"]
+            lo_win, hi_win = RATE_LIMIT_BOUNDS["window"]
+            if success:
+                self.rate = min(hi_rate, self.rate + RATE_LIMIT_INCREASE / self.window)
+                self.window = min(hi_win, self.window + 1.0 / self.window)
+            elif throttled:
+                now = time.monotonic()
+                if now - self.last_decrease >= 1.0:
+                    self.rate = max(lo_rate, self.rate * 0.5)
+                    self.window = max(lo_win, self.window * 0.5)
+                    self.last_decrease = now
+            self.cond.notify_all()
+
+    def snapshot(self):
+        with self.cond: return {"rate": round(self.rate, 2), "window": round(self.window, 2)}
+
+def is_throttle_error(e, timeouts=True):
+    # timeouts=False: 명시적인 속도 제한 응답만 (상태 확인용 - 확인 타임아웃은 엔진 실패로 봄)
+    if timeouts and (isinstance(e, TimeoutError) or "timeout" in type(e).__name__.lower()): return True  # requests ReadTimeout 등
+    if getattr(getattr(e, "response", None), "status_code", None) in (429, 503): return True
+    return bool(THROTTLE_PATTERN.search(str(e)))
+
+class CircuitOpenError(RuntimeError):
+    # 요청을 보내지 않고 거절됨 (OPEN / half-open 시험 요청 진행 중)
+    pass
+
+# 엔진별 EWMA 지연/오류율 + Circuit Breaker (CLOSED -> OPEN -> HALF_OPEN -> CLOSED)
+class EngineHealth:
+    def __init__(self):
+        self.latency = None
+        self.error_rate = 0.0
+        self.failures = 0
+        self.state = "CLOSED"
+        self.opened_at = 0.0
+        self.cooldown = BREAKER_COOLDOWN[0]
+        self.trial_in_flight = False
+        self.samples = deque(maxlen=200)  # 최근 성공 지연 (헤지 기준 백분위 계산용)
+        self.lock = threading.Lock()
+
+    def _cooled_down(self):
+        return self.state == "OPEN" and time.monotonic() - self.opened_at >= self.cooldown
+
+    def available(self):
+        # 부수효과 없는 확인 (라우팅 후보 선정용)
+        with self.lock:
+            return self.state == "CLOSED" or self._cooled_down() or (self.state == "HALF_OPEN" and not self.trial_in_flight)
+
+    def allow(self):
+        # 실제 요청 직전 호출: OPEN 쿨다운이 끝났으면 half-open 시험 요청 1건만 허용
+        with self.lock:
+            if self.state == "CLOSED": return True
+            if self._cooled_down(): self.state = "HALF_OPEN"
+            if self.state == "HALF_OPEN" and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def cancel_trial(self):
+        # allow() 뒤 요청을 보내지 못함 (속도 제한 슬롯 대기 초과) -> half-open 시험 기회 반납
+        with self.lock: self.trial_in_flight = False
+
+    def record(self, success, latency):
+        with self.lock:
+            a = HEALTH_EWMA_ALPHA
+            self.latency = latency if self.latency is None else (1 - a) * self.latency + a * latency
+            self.error_rate = (1 - a) * self.error_rate + a * (0.0 if success else 1.0)
+            if success:
+                self.samples.append(latency)
+                self.failures = 0
+                self.state = "CLOSED"
+                self.cooldown = BREAKER_COOLDOWN[0]
+            else:
+                self.failures += 1
+                if self.state == "HALF_OPEN":
+                    self.cooldown = min(BREAKER_COOLDOWN[1], self.cooldown * 2)
+                    self.state, self.opened_at = "OPEN", time.monotonic()
+                elif self.state == "CLOSED" and self.failures >= BREAKER_FAILURE_THRESHOLD:
+                    self.state, self.opened_at = "OPEN", time.monotonic()
+            self.trial_in_flight = False
+
+    def percentile(self, q):
+        with self.lock:
+            if len(self.samples) < HEDGE_MIN_SAMPLES: return None
+            ordered = sorted(self.samples)
+        return ordered[int(q * (len(ordered) - 1))]
+
+    def score(self):
+        # 낮을수록 좋음: 지연 x 오류 가중치 (측정 전에는 1초로 가정)
+        with self.lock:
+            latency = self.latency if self.latency is not None else 1.0
+            return latency * (1 + 4 * self.error_rate)
+
+    def snapshot(self):
+        with self.lock:
+            return {"state": self.state, "latency": round(self.latency, 3) if self.latency is not None else None,
+                    "error_rate": round(self.error_rate, 3)}
+
+# 헤지(중복) 요청이 전체 요청의 max_ratio를 넘지 않도록 제한하고 횟수를 집계
+class HedgeBudget:
+    def __init__(self, max_ratio):
+        self.max_ratio = max_ratio
+        self.requests = 0
+        self.hedges = 0
+        self.wins = 0
+        self.lock = threading.Lock()
+
+    def record_request(self):
+        with self.lock: self.requests += 1
+
+    def try_hedge(self):
+        with self.lock:
+            if self.hedges + 1 > self.max_ratio * self.requests: return False
+            self.hedges += 1
+            return True
+
+    def record_win(self):
+        with self.lock: self.wins += 1
+
+    def snapshot(self):
+        with self.lock: return {"requests": self.requests, "hedges": self.hedges, "wins": self.wins}
+
+# 실패한 복구 재시도 수를 전체 작업 수의 max_ratio (최소 min_retries) + 초당 refill_per_sec 이내로 제한
+# 성공한 재시도는 차감하지 않음, 예산이 없으면 실패 처리 대신 다시 생길 때까지 대기
+class RetryBudget:
+    def __init__(self, max_ratio, min_retries, refill_per_sec):
+        self.max_ratio = max_ratio
+        self.min_retries = min_retries
+        self.refill_per_sec = refill_per_sec
+        self.started = time.monotonic()
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.waits = 0
+        self.lock = threading.Lock()
+
+    def record_requests(self, count):
+        with self.lock: self.requests += count
+
+    def wait_time(self):
+        # 다음 재시도까지 기다릴 시간 (0 = 바로 가능, None = 다시 채워지지 않음)
+        with self.lock:
+            limit = max(self.min_retries, self.max_ratio * self.requests) + self.refill_per_sec * (time.monotonic() - self.started)
+            over = self.failures + 1 - limit
+            if over <= 0: return 0.0
+            self.waits += 1
+            return over / self.refill_per_sec if self.refill_per_sec > 0 else None
+
+    def record(self, ok):
+        with self.lock:
+            self.retries += 1
+            if not ok: self.failures += 1
+
+    def snapshot(self):
+        with self.lock: return {"requests": self.requests, "retries": self.retries, "failures": self.failures, "waits": self.waits}
+
+# Ollama 응답의 시간 필드(ns)를 누적: 첫 토큰까지 지연(load + prompt eval)과 생성 속도(tokens/sec)
+class GenerationStats:
+    FIELDS = ("requests", "first_token_ns", "prompt_eval_count", "eval_count", "eval_ns")
+
+    def __init__(self):
+        self.totals = dict.fromkeys(self.FIELDS, 0)
+        self.lock = threading.Lock()
+
+    def record(self, res_json):
+        with self.lock:
+            self.totals["requests"] += 1
+            self.totals["first_token_ns"] += res_json.get("load_duration", 0) + res_json.get("prompt_eval_duration", 0)
+            self.totals["prompt_eval_count"] += res_json.get("prompt_eval_count", 0)
+            self.totals["eval_count"] += res_json.get("eval_count", 0)
+            self.totals["eval_ns"] += res_json.get("eval_duration", 0)
+
+    def snapshot(self):
+        with self.lock: return dict(self.totals)
+
+    @staticmethod
+    def describe(start, end):
+        delta = {k: end[k] - start[k] for k in GenerationStats.FIELDS}
+        n = delta["requests"]
+        return {
+            "requests": n,
+            "avg_first_token_ms": round(delta["first_token_ns"] / n / 1e6, 1) if n else None,
+            "avg_prompt_tokens": round(delta["prompt_eval_count"] / n, 1) if n else None,
+            "tokens_per_sec": round(delta["eval_count"] / (delta["eval_ns"] / 1e9), 1) if delta["eval_ns"] else None,
+        }
+
+# 온라인 요청 전용 공유 풀 - with 블록 밖에 두어 진 요청을 기다리지 않고 버릴 수 있음
+_engine_pool = None
+_engine_pool_lock = threading.Lock()
+
+def get_engine_pool():
+    global _engine_pool
+    with _engine_pool_lock:
+        if _engine_pool is None:
+            workers = max(MAX_WORKERS, config.get("async_concurrency")) * 2
+            _engine_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="engine")
+        return _engine_pool
+
+# 문서 단위 시간 예산: 남은 시간이 줄면 호출별 타임아웃도 비례해서 줄임
+class DeadlineBudget:
+    def __init__(self, seconds):
+        self.expires = time.monotonic() + seconds if seconds else None
+
+    def remaining(self):
+        if self.expires is None: return None
+        return max(0.0, self.expires - time.monotonic())
+
+    def timeout(self, base):
+        remaining = self.remaining()
+        if remaining is None: return base
+        # 하한을 백엔드 기본 타임아웃에 비례시킴 (Ollama 60초 호출이 1.5초로 잘리지 않도록)
+        floor = min(base, max(DEADLINE_MIN_TIMEOUT[0], base * DEADLINE_MIN_TIMEOUT[1]))
+        return max(floor, min(base, remaining / 10))
+
+def call_timeout(base, deadline):
+    return deadline.timeout(base) if deadline else base
+
+# ===== [Helper(Metrics)] =====
+# 프로세스 누적 지표: 엔진별 요청 수 / 지연 히스토그램, 단계별 시간, 큐 깊이 / 워커 사용률
+# 파일별 JSON (metrics_json), Prometheus text 파일 (metrics_prom_path), /metrics 엔드포인트 (metrics_port)로 내보냄
+METRIC_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PIPELINE_STAGES = ("open", "collect", "translate", "recovery", "write_back", "save")
+
+class StageTimer:
+    # 문서 하나의 단계별 누적 시간 (translate / recovery는 워커 시간의 합)
+    def __init__(self):
+        self.seconds = dict.fromkeys(PIPELINE_STAGES, 0.0)
+
+    def add(self, stage, seconds):
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+
+    def snapshot(self):
+        return {stage: round(v, 3) for stage, v in self.seconds.items()}
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.engines = {}   # engine -> {"ok", "error", "sum", "buckets"}
+        self.stages = dict.fromkeys(PIPELINE_STAGES, 0.0)
+        self.segments = {}
+        self.files = {"ok": 0, "error": 0}
+        self.queue_depth = 0
+        self.queue_depth_max = 0
+        self.utilization = 0.0
+
+    def observe_request(self, engine, seconds, ok):
+        with self.lock:
+            e = self.engines.setdefault(engine, {"ok": 0, "error": 0, "sum": 0.0, "buckets": [0] * (len(METRIC_BUCKETS) + 1)})
+            e["ok" if ok else "error"] += 1
+            e["sum"] += seconds
+            e["buckets"][next((i for i, b in enumerate(METRIC_BUCKETS) if seconds <= b), len(METRIC_BUCKETS))] += 1
+
+    def set_queue(self, depth, utilization=None):
+        with self.lock:
+            self.queue_depth = depth
+            self.queue_depth_max = max(self.queue_depth_max, depth)
+            if utilization is not None: self.utilization = utilization
+
+    def add_file(self, summary, stages):
+        with self.lock:
+            self.files["error" if summary is None else "ok"] += 1
+            for stage, v in (stages or {}).items(): self.stages[stage] = self.stages.get(stage, 0.0) + v
+            for status in ("SUCCESS", "SKIPPED", "FAILED", "RECOVERED", "RESUMED", "TM_HIT", "GLOSSARY_HIT"):
+                if summary and summary.get(status): self.segments[status] = self.segments.get(status, 0) + summary[status]
+
+    def snapshot_engines(self):
+        with self.lock: return {engine: {**e, "buckets": list(e["buckets"])} for engine, e in self.engines.items()}
+
+    @staticmethod
+    def describe_engines(start, end):
+        # 두 스냅샷 사이의 엔진별 요청 수 / 평균 지연 / p95가 속한 버킷 상한
+        result = {}
+        for engine, e in end.items():
+            s = start.get(engine, {"ok": 0, "error": 0, "sum": 0.0, "buckets": [0] * len(e["buckets"])})
+            buckets = [a - b for a, b in zip(e["buckets"], s["buckets"])]
+            count = sum(buckets)
+            if not count: continue
+            p95, seen = None, 0
+            for bound, n in zip(METRIC_BUCKETS + (None,), buckets):
+                seen += n
+                if seen >= count * 0.95:
+                    p95 = bound
+                    break
+            result[engine] = {"requests": count, "errors": e["error"] - s["error"],
+                              "avg_ms": round((e["sum"] - s["sum"]) / count * 1000, 1), "p95_le_sec": p95}
+        return result
+
+    def prometheus(self):
+        # Prometheus text exposition format
+        with self.lock:
+            lines = ["# TYPE docubridge_engine_requests_total counter"]
+            for engine, e in sorted(self.engines.items()):
+                for outcome in ("ok", "error"):
+                    lines.append(f'docubridge_engine_requests_total{{engine="{engine}",outcome="{outcome}"}} {e[outcome]}')
+            lines.append("# TYPE docubridge_engine_request_seconds histogram")
+            for engine, e in sorted(self.engines.items()):
+                cumulative = 0
+                for bound, n in zip(METRIC_BUCKETS + ("+Inf",), e["buckets"]):
+                    cumulative += n
+                    lines.append(f'docubridge_engine_request_seconds_bucket{{engine="{engine}",le="{bound}"}} {cumulative}')
+                lines.append(f'docubridge_engine_request_seconds_sum{{engine="{engine}"}} {e["sum"]:.6f}')
+                lines.append(f'docubridge_engine_request_seconds_count{{engine="{engine}"}} {cumulative}')
+            lines.append("# TYPE docubridge_stage_seconds_total counter")
+            for stage, v in self.stages.items(): lines.append(f'docubridge_stage_seconds_total{{stage="{stage}"}} {v:.6f}')
+            lines.append("# TYPE docubridge_segments_total counter")
+            for status, n in sorted(self.segments.items()): lines.append(f'docubridge_segments_total{{status="{status}"}} {n}')
+            lines.append("# TYPE docubridge_files_total counter")
+            for outcome, n in self.files.items(): lines.append(f'docubridge_files_total{{outcome="{outcome}"}} {n}')
+            lines.append("# TYPE docubridge_queue_depth gauge")
+            lines.append(f"docubridge_queue_depth {self.queue_depth}")
+            lines.append("# TYPE docubridge_queue_depth_max gauge")
+            lines.append(f"docubridge_queue_depth_max {self.queue_depth_max}")
+            lines.append("# TYPE docubridge_worker_utilization gauge")
+            lines.append(f"docubridge_worker_utilization {self.utilization:.4f}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        # node_exporter textfile collector가 쓰다 만 파일을 읽지 않도록 임시 파일 후 교체
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f: f.write(self.prometheus())
+        os.replace(tmp, path)
+
+metrics = Metrics()
+metrics_server = None
+
+def start_metrics_server(port):
+    # 127.0.0.1:<port>/metrics 로 Prometheus scrape 허용 (한 번만 시작)
+    global metrics_server
+    if metrics_server or not port: return
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        def log_message(self, format, *args): pass
+
+    metrics_server = ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+    metrics_server.daemon_threads = True
+    threading.Thread(target=metrics_server.serve_forever, daemon=True).start()
+
 # ===== [Logic - Translation Backends] =====
 class TranslationBackend:
     def check_health(self, app):
         raise NotImplementedError
-    def translate(self, text, task_index, app, logger, task_id):
+    # translate는 (결과, 엔진 ID) 튜플 반환 - 실패 시 (None, None)
+    # recovery_engines: 복구 시도 순서 (건강한 엔진 우선), recover_with: 지정한 엔진으로 1회 요청 -> 결과 또는 None
+    # deadline: 문서 단위 DeadlineBudget (없으면 기본 타임아웃)
+    label = "-"
+    def translate(self, text, task_index, app, logger, task_id, deadline=None):
+        raise NotImplementedError
+    def recovery_engines(self):
         raise NotImplementedError
-    def recover_batch(self, text):
+    def recover_with(self, engine, text):
         raise NotImplementedError
+    def engine_ids(self):
+        raise NotImplementedError
+    def translate_batch(self, texts, task_index, app, logger, task_ids, deadline=None):
+        # 기본 구현: 세그먼트별 개별 요청
+        return [self.translate(t, task_index, app, logger, tid, deadline) for t, tid in zip(texts, task_ids)]
+
+    # Async 인터페이스: 기본 구현은 동기 메서드를 이벤트 루프의 executor에서 실행
+    # (translators 패키지는 동기 API만 제공 - 내부적으로 엔진별 세션을 재사용함)
+    async def translate_async(self, text, task_index, app, logger, task_id, session, deadline=None):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.translate, text, task_index, app, logger, task_id, deadline)
+    async def translate_batch_async(self, texts, task_index, app, logger, task_ids, session, deadline=None):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.translate_batch, texts, task_index, app, logger, task_ids, deadline)
 
 # 1. Online Backend (from Old Docubridge)
 class OnlineBackend(TranslationBackend):
+    label = "Online"
+
     def __init__(self):
         self.candidate_engines = ['google', 'bing', 'alibaba']
         self.active_engines = []
-
-    def check_health(self, app):
-        self.active_engines = []
-        test_text = "테스트"
+        # 지난 실행에서 학습된 속도로 시작
+        learned = config.get("learned_rate_limits") or {}
+        self.limiters = {}
+        self.health = {engine: EngineHealth() for engine in self.candidate_engines}
+        self.hedge = HedgeBudget(config.get("hedge_max_ratio"))
         for engine in self.candidate_engines:
-            try:
-                # 짧은 타임아웃으로 상태 확인
-                res = ts.translate_text(test_text, translator=engine, from_language='ko', to_language='en', timeout=3)
-                if res: self.active_engines.append(engine)
-            except: pass
-        
-        # 최소한 구글은 추가 (실패하더라도 시도는 하도록)
-        if not self.active_engines: self.active_engines.append('google')
+            limits = {}
+            for k, default in RATE_LIMIT_DEFAULT.items():
+                lo, hi = RATE_LIMIT_BOUNDS[k]
+                value = min(hi, max(lo, learned.get(engine, {}).get(k, default)))
+                limits[k] = value + (default - value) * RATE_LIMIT_DECAY
+            self.limiters[engine] = AdaptiveRateLimiter(limits["rate"], limits["window"])
+
+    def call_engine(self, engine, text, timeout=None):
+        # 모든 온라인 요청은 여기를 거쳐 엔진별 속도 제한 / circuit breaker / 지연 측정을 받음
+        # OPEN 엔진은 슬롯을 기다리지 않고 바로 거절 (모든 엔진이 막혔으면 점수가 가장 좋은 엔진은 통과)
+        if not self.health[engine].allow() and not self.last_resort(engine): raise CircuitOpenError(f"{engine}: circuit open")
+        limiter = self.limiters[engine]
+        if not limiter.acquire():
+            self.health[engine].cancel_trial()
+            raise TimeoutError(f"{engine}: rate limit slot wait timed out")
+        ok = throttled = False
+        start = time.monotonic()
+        try:
+            res = ts.translate_text(text, translator=engine, from_language='ko', to_language='en', timeout=timeout)
+            ok = bool(res)
+            return res
+        except Exception as e:
+            throttled = is_throttle_error(e)
+            raise
+        finally:
+            elapsed = time.monotonic() - start
+            limiter.release(ok, throttled)
+            self.health[engine].record(ok, elapsed)
+            metrics.observe_request(engine, elapsed, ok)
+
+    def get_rate_limits(self):
+        return {engine: limiter.snapshot() for engine, limiter in self.limiters.items()}
+
+    def save_rate_limits(self):
+        # 학습된 값을 그대로 저장 (기본값 쪽으로 당기는 건 읽을 때 RATE_LIMIT_DECAY로)
+        config.set("learned_rate_limits", self.get_rate_limits())
+
+    def race_engines(self, queue, text, timeout, logger=None, task_id=-1):
+        # 1순위 엔진이 p90 지연 안에 답하지 않으면 다음 엔진에 중복 요청(헤지), 먼저 온 성공 응답 사용
+        # 실패하면 다음 엔진으로 즉시 넘어감 (기존 순차 failover와 동일)
+        pool = get_engine_pool()
+        remaining = list(queue)
+        pending = {}
+        hedged = set()
+        hedging = config.get("hedge_enabled")
+
+        def launch():
+            engine = remaining.pop(0)
+            pending[pool.submit(self.call_engine, engine, text, timeout)] = engine
+            return engine
+
+        primary = launch()
+        self.hedge.record_request()
+        while pending:
+            delay = self.health[primary].percentile(config.get("hedge_percentile")) if hedging and remaining else None
+            done, _ = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+            if not done:
+                if self.hedge.try_hedge():
+                    engine = launch()
+                    hedged.add(engine)
+                    if logger: logger.add(task_id, "HEDGE", f"Online({engine})", text, f"{primary} exceeded {delay:.2f}s")
+                else: hedging = False
+                continue
+            for future in done:
+                engine = pending.pop(future)
+                try: res = future.result()
+                except: res = None
+                if res:
+                    if engine in hedged: self.hedge.record_win()
+                    return res, engine
+            if not pending and remaining: primary = launch()
+        return None, None
 
-    def translate(self, text, task_index, app, logger, task_id):
-        if not self.active_engines: return None
+    def get_engine_health(self):
+        return {engine: health.snapshot() for engine, health in self.health.items()}
+
+    def is_degraded(self):
+        # 사용 가능한 엔진이 없거나, 가장 빠른 엔진조차 느리면 degraded
+        usable = [e for e in self.active_engines if self.health[e].available()]
+        if not usable: return True
+        return min(self.health[e].score() for e in usable) >= DEGRADED_LATENCY
+
+    def last_resort(self, engine):
+        # 사용 가능한 엔진이 하나도 없을 때의 마지막 수단 (기존: 구글은 항상 시도)
+        active = self.active_engines
+        if engine not in active or any(self.health[e].available() for e in active): return False
+        return engine == min(active, key=lambda e: self.health[e].score())
+
+    def probe(self, engine):
+        # 짧은 타임아웃으로 상태 확인 -> 지연(초), 실패면 None (결과는 라우팅용 EngineHealth에도 반영)
+        # 배치 중 백그라운드 확인도 속도 제한 슬롯을 거침 - 슬롯이 없으면 사용 중인 엔진이므로 최근 지연으로 대신
+        # 429 등 속도 제한 응답은 살아 있는 것으로 보고 rate만 줄임, 실패는 BREAKER_FAILURE_THRESHOLD에 맡김
+        limiter = self.limiters[engine]
+        if not limiter.acquire(3): return self.health[engine].snapshot()["latency"]
+        ok = throttled = False
+        start = time.monotonic()
+        try: ok = bool(ts.translate_text("테스트", translator=engine, from_language='ko', to_language='en', timeout=3))
+        except Exception as e: throttled = is_throttle_error(e, timeouts=False)
+        elapsed = time.monotonic() - start
+        limiter.release(ok, throttled)
+        if not throttled: self.health[engine].record(ok, elapsed)
+        return round(elapsed, 3) if ok or throttled else None
+
+    def check_health(self, app):
+        # 모든 엔진을 동시에 확인 -> {engine: 지연 또는 None}
+        pool = get_engine_pool()
+        futures = {engine: pool.submit(self.probe, engine) for engine in self.candidate_engines}
+        latencies = {engine: future.result() for engine, future in futures.items()}
+        self.apply_health(latencies)
+        return latencies
+
+    def apply_health(self, latencies, cached=False):
+        # cached: 디스크에 저장된 지난 확인 결과 -> 측정 지연으로 EngineHealth를 미리 채워 첫 라우팅에 사용
+        # 확인에 실패한 엔진도 로테이션에 남김 -> 실패 1회로 OPEN 되지 않고 circuit breaker 임계값이 판단
+        if cached:
+            for engine, latency in latencies.items():
+                if engine in self.health: self.health[engine].record(latency is not None, latency if latency is not None else 3.0)
+        self.active_engines = list(self.candidate_engines)
+
+    def engine_ids(self):
+        return list(self.candidate_engines)
+
+    def engine_queue(self, task_index):
+        # 건강한 엔진을 EWMA 점수 순으로 (동점이면 task_index 기준 round-robin)
+        # 백그라운드 상태 확인이 active_engines를 바꿀 수 있어 한 번만 읽음
+        active = self.active_engines
+        n = len(active)
+        candidates = [e for e in active if self.health[e].available()] or list(active)
+        ranked = sorted(candidates, key=lambda e: (self.health[e].score(), (active.index(e) - task_index) % n))
+        # 가장 빠른 엔진의 동시 요청 window가 꽉 찼으면 여유 있는 엔진부터
+        free = [e for e in ranked if self.limiters[e].has_capacity()]
+        return free + [e for e in ranked if e not in free]
+
+    def translate(self, text, task_index, app, logger, task_id, deadline=None):
+        if not self.active_engines: return None, None
         
-        primary_idx = task_index % len(self.active_engines)
-        # Round-robin queue
-        queue = [self.active_engines[primary_idx]] + [e for e in self.active_engines if e != self.active_engines[primary_idx]]
+        queue = self.engine_queue(task_index)
         
-        if text.strip() == "기타":
-            if logger: logger.add(task_id, "REPLACE", "System", text, "Etc")
-            return "Etc"
-            
-        for engine in queue:
-            try:
+        if app.debug_mode: time.sleep(random.uniform(0.1, 0.3))
+        res, engine = self.race_engines(queue, text, call_timeout(5, deadline), logger, task_id)
+        if res:
+            if logger: logger.add(task_id, "SUCCESS", f"Online({engine})", text, res)
+            return res, engine
+        return None, None
+
+    def translate_batch(self, texts, task_index, app, logger, task_ids, deadline=None):
+        if not self.active_engines: return [(None, None)] * len(texts)
+        queue = self.engine_queue(task_index)
+        max_chars = min(ENGINE_CHAR_LIMITS.get(e, 1000) for e in queue)
+        results = [(None, None)] * len(texts)
+        for group in pack_segments(texts, max_chars, config.get("batch_max_segments")):
+            decoded, used_engine = None, None
+            if len(group) > 1:
+                payload = encode_numbered([texts[i] for i in group])
                 if app.debug_mode: time.sleep(random.uniform(0.1, 0.3))
-                res = ts.translate_text(text, translator=engine, from_language='ko', to_language='en', timeout=5)
-                if res:
-                    if logger: logger.add(task_id, "SUCCESS", f"Online({engine})", text, res)
-                    return res
-            except: continue
-        return None
+                res, used_engine = self.race_engines(queue, payload, call_timeout(10, deadline), logger, task_ids[group[0]])
+                # 응답 개수가 맞지 않으면 다른 엔진 대신 개별 요청으로 전환
+                if res: decoded = decode_numbered(res, len(group))
+            if decoded is None and len(group) > 1 and logger:
+                reason = "Count mismatch" if used_engine else "All engines failed"
+                logger.add(task_ids[group[0]], "BATCH_SPLIT", f"Online({used_engine})", payload, f"{reason} -> per-segment")
+            for pos, i in enumerate(group):
+                out = decoded[pos] if decoded else None
+                if out:
+                    if logger: logger.add(task_ids[i], "SUCCESS", f"Online({used_engine})[batch]", texts[i], out)
+                    results[i] = (out, used_engine)
+                else:
+                    results[i] = self.translate(texts[i], task_index, app, logger, task_ids[i], deadline)
+        return results
 
-    def recover_batch(self, text):
-        # Recovery Logic: Try all engines concurrently
-        with ThreadPoolExecutor(max_workers=len(self.active_engines)) as executor:
-            futures = {executor.submit(ts.translate_text, text, translator=eng, from_language='ko', to_language='en'): eng for eng in self.active_engines}
-            done, not_done = wait(futures, return_when=FIRST_COMPLETED)
-            for future in done:
-                try:
-                    result = future.result()
-                    if result: return result, futures[future]
-                except: continue
-        return None, None
+    def recovery_engines(self):
+        # EWMA 점수 순 (OPEN 상태 엔진은 제외, 전부 OPEN이면 전체)
+        active = self.active_engines
+        usable = [e for e in active if self.health[e].available()] or list(active)
+        return sorted(usable, key=lambda e: self.health[e].score())
+
+    def recover_with(self, engine, text):
+        return self.call_engine(engine, text, 10)
 
 # 2. Local AI Backend (Ollama)
 class OllamaBackend(TranslationBackend):
+    label = "Local"
+
     def __init__(self):
-        self.api_url = "http://localhost:11434/api/generate"
+        self.base_url = config.get("ollama_url").rstrip("/")
+        self.api_url = f"{self.base_url}/api/chat"
+        self.keep_alive = config.get("ollama_keep_alive")
+        self.stats = GenerationStats()
+        self.load_seconds = None
         self.model_name = config.get("ollama_model", "qwen2.5:1.5b")
-        # CPU/GPU 리소스 보호를 위해 Lock 사용 (MAX_WORKERS=4여도 Ollama는 1개씩 or 병렬설정따라)
-        self.lock = threading.Lock()
+        # CPU/GPU 리소스 보호를 위해 슬롯 수만큼만 동시 요청 (서버의 OLLAMA_NUM_PARALLEL에 맞춤)
+        self.set_parallel(1)
         self.is_available = False
-
-    def check_health(self, app):
+        self.warmed = False
+        # 요청마다 새 TCP 연결을 만들지 않도록 세션 공유
+        self.session = requests.Session()
+        self.session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS * 2))
+
+    @property
+    def engine_id(self):
+        return f"ollama:{self.model_name}"
+
+    def engine_ids(self):
+        return [self.engine_id]
+
+    def set_parallel(self, n):
+        self.parallel = max(1, int(n))
+        self.slots = threading.BoundedSemaphore(self.parallel)
+        self.async_slots = None  # 이벤트 루프 안에서 다시 생성
+
+    def detect_parallel(self):
+        configured = config.get("ollama_num_parallel")
+        if configured: return configured
+        # 로컬 서버와 같은 환경변수를 읽음 (API로는 노출되지 않음)
+        try: return int(os.environ.get("OLLAMA_NUM_PARALLEL", "1"))
+        except ValueError: return 1
+
+    def check_health(self, app, interactive=True):
+        # interactive=False: 백업용 조용한 확인 (모델 다운로드를 묻지 않음)
         # 1. Ollama 실행 여부 확인
         try:
-            requests.get("http://localhost:11434/", timeout=2)
+            requests.get(f"{self.base_url}/", timeout=2)
         except:
             # Ollama가 꺼져있으면 Local 사용 불가 처리
             self.is_available = False
@@ -274,68 +1301,240 @@ class OllamaBackend(TranslationBackend):
 
         # 2. 모델 존재 여부 확인 및 자동 설치
         try:
-            res = requests.get("http://localhost:11434/api/tags", timeout=5)
+            res = requests.get(f"{self.base_url}/api/tags", timeout=5)
             models = [m['name'] for m in res.json().get('models', [])]
             
             if not any(self.model_name in m for m in models):
                 # 모델이 없으면 사용자에게 물어보고 다운로드
-                if messagebox.askyesno("AI Model Missing", 
-                                       f"로컬 AI 모델 '{self.model_name}'이 없습니다.\n다운로드하시겠습니까? (약 1~2GB)"):
+                if interactive and app.confirm("AI Model Missing", 
+                                               f"로컬 AI 모델 '{self.model_name}'이 없습니다.\n다운로드하시겠습니까? (약 1~2GB)"):
                     self.download_model(app)
                 else:
                     self.is_available = False
                     return
             
             self.is_available = True
+            parallel = self.detect_parallel()
+            if parallel != self.parallel: self.set_parallel(parallel)
             
         except Exception as e:
             self.is_available = False
-            if app.debug_mode: print(f"Ollama Health Check Error: {e}")
+            if app.debug_mode: app.log_message(f"Ollama Health Check Error: {e}")
+
+    def apply_cached(self, app, cached):
+        # 지난 확인 결과 재사용 (모델 로드는 ensure_warm에서 필요할 때만)
+        self.is_available = bool(cached.get("available"))
+        if not self.is_available: return
+        if cached.get("parallel") and cached["parallel"] != self.parallel: self.set_parallel(cached["parallel"])
+
+    def ensure_warm(self, app):
+        # Local이 실제로 부하를 받을 때만 모델을 올림 (온라인 우선 + 정상이면 1~2GB 모델을 keep_alive 동안 붙잡지 않음)
+        # 배치마다 한 번, 백그라운드로 (warmed는 HybridBackendManager.check_health에서 초기화)
+        if self.warmed or not self.is_available or app is None: return
+        self.warmed = True
+        threading.Thread(target=self.warm_up, args=(app,), daemon=True).start()
+
+    def warm_up(self, app):
+        # 빈 프롬프트로 모델을 미리 올리고 keep_alive 동안 유지 -> 첫 번역이 로딩 시간을 떠안지 않음
+        try:
+            start = time.monotonic()
+            self.session.post(f"{self.base_url}/api/generate", json={"model": self.model_name, "keep_alive": self.keep_alive}, timeout=120)
+            self.load_seconds = time.monotonic() - start
+            app.log_message(f"Local AI '{self.model_name}' loaded in {self.load_seconds:.1f}s (keep_alive {self.keep_alive})")
+        except Exception as e:
+            if app.debug_mode: app.log_message(f"Ollama warm-up failed: {e}")
 
     def download_model(self, app):
         app.update_status_text(f"Downloading {self.model_name}... (This may take a while)")
         # 윈도우 터미널을 열지 않고 백그라운드에서 실행
         try:
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            startupinfo = None
+            if os.name == 'nt':
+                startupinfo = subprocess.STARTUPINFO()
+                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
             process = subprocess.Popen(["ollama", "pull", self.model_name], 
                                        stdout=subprocess.PIPE, stderr=subprocess.PIPE, 
                                        startupinfo=startupinfo)
             process.wait() # 다운로드 끝날 때까지 대기
             app.update_status_text("Model download complete.")
         except Exception as e:
-            messagebox.showerror("Download Failed", f"모델 다운로드 실패: {e}")
-
-    def translate(self, text, task_index, app, logger, task_id):
-        if not self.is_available: return None
-
-        prompt = f"Translate this Korean text to English. Output ONLY the translated text without any explanation.\n\nKorean: {text}\nEnglish:"
-        payload = {
+            app.show_error("Download Failed", f"모델 다운로드 실패: {e}")
+
+    @staticmethod
+    def generation_options(source_chars, prompt_chars, num_predict=None):
+        # 한글 1자 ~= 토큰 1개로 넉넉히 잡고, 영어 출력은 원문 글자 수의 1.5배 토큰까지 허용
+        if num_predict is None: num_predict = int(source_chars * 1.5) + 64
+        num_predict = max(OLLAMA_MIN_PREDICT, min(OLLAMA_MAX_PREDICT, num_predict))
+        num_ctx = OLLAMA_MIN_CTX
+        while num_ctx < prompt_chars + num_predict and num_ctx < OLLAMA_MAX_CTX: num_ctx *= 2
+        return {"temperature": 0.0, "num_predict": num_predict, "num_ctx": num_ctx}
+
+    def chat_payload(self, system, user, options, **extra):
+        return {
             "model": self.model_name,
-            "prompt": prompt,
+            "messages": [{"role": "system", "content": system}, {"role": "user", "content": user}],
             "stream": False,
-            "options": {"temperature": 0.0, "num_predict": 128, "num_ctx": 2048}
+            "keep_alive": self.keep_alive,
+            "options": options,
+            **extra
         }
 
-        with self.lock: # 리소스 보호
+    def build_payload(self, text, num_predict=None):
+        options = self.generation_options(len(text), len(OLLAMA_SYSTEM_PROMPT) + len(text), num_predict)
+        return self.chat_payload(OLLAMA_SYSTEM_PROMPT, text, options)
+
+    def response_text(self, res_json):
+        self.stats.record(res_json)
+        return (res_json.get("message") or {}).get("content", "")
+
+    def parse_response(self, res_json):
+        translated = self.response_text(res_json).strip()
+        # 후처리
+        if translated.lower().startswith("english:"): translated = translated[8:].strip()
+        return translated.strip('"').strip("'")
+
+    @staticmethod
+    def is_truncated(res_json):
+        # num_predict 한도에 걸려 생성이 끊긴 응답
+        return res_json.get("done_reason") == "length"
+
+    def next_predict(self, payload):
+        # 잘린 응답 재시도용: 한도를 두 배로 (최대치였다면 재시도 없음)
+        current = payload["options"]["num_predict"]
+        return current * 2 if current < OLLAMA_MAX_PREDICT else None
+
+    def build_batch_payload(self, items):
+        user = json.dumps(items, ensure_ascii=False)
+        source_chars = sum(len(t) for t in items)
+        # JSON 구조 오버헤드만큼 여유 추가
+        options = self.generation_options(source_chars, len(OLLAMA_BATCH_SYSTEM_PROMPT) + len(user), int(source_chars * 1.5) + 32 * len(items) + 64)
+        return self.chat_payload(OLLAMA_BATCH_SYSTEM_PROMPT, user, options, format="json")
+
+    def translate(self, text, task_index, app, logger, task_id, deadline=None):
+        if not self.is_available: return None, None
+
+        num_predict = None
+        while True:
+            payload = self.build_payload(text, num_predict)
             try:
-                response = requests.post(self.api_url, json=payload, timeout=60)
-                if response.status_code == 200:
-                    res_json = response.json()
-                    translated = res_json.get("response", "").strip()
-                    # 후처리
-                    if translated.lower().startswith("english:"): translated = translated[8:].strip()
-                    translated = translated.strip('"').strip("'")
-                    
-                    if translated:
-                        if logger: logger.add(task_id, "SUCCESS", "Local_AI", text, translated)
-                        return translated
+                res_json = self._post(payload, call_timeout(60, deadline))
             except Exception as e:
                 if logger: logger.add(task_id, "ERROR", "Local_AI", text, str(e))
-        return None
+                return None, None
+            if not res_json: return None, None
+            if self.is_truncated(res_json):
+                num_predict = self.next_predict(payload)
+                if logger: logger.add(task_id, "TRUNCATED", "Local_AI", text, f"num_predict={payload['options']['num_predict']} reached")
+                if num_predict: continue
+                return None, None
+            translated = self.parse_response(res_json)
+            if translated:
+                if logger: logger.add(task_id, "SUCCESS", "Local_AI", text, translated)
+                return translated, self.engine_id
+            return None, None
+
+    def translate_batch(self, texts, task_index, app, logger, task_ids, deadline=None):
+        if not self.is_available: return [(None, None)] * len(texts)
+        results = [(None, None)] * len(texts)
+        for group in pack_segments(texts, OLLAMA_BATCH_MAX_CHARS, config.get("batch_max_segments")):
+            decoded, reason = None, "Count mismatch"
+            if len(group) > 1:
+                payload = self.build_batch_payload([texts[i] for i in group])
+                try:
+                    res_json = self._post(payload, call_timeout(120, deadline))
+                    if res_json and self.is_truncated(res_json): reason = "Truncated"
+                    elif res_json: decoded = decode_json_list(self.response_text(res_json), len(group))
+                except Exception as e:
+                    if logger: logger.add(task_ids[group[0]], "ERROR", "Local_AI[batch]", payload["messages"][1]["content"], str(e))
+                if decoded is None and logger:
+                    logger.add(task_ids[group[0]], "BATCH_SPLIT", "Local_AI", payload["messages"][1]["content"], f"{reason} -> per-segment")
+            for pos, i in enumerate(group):
+                out = decoded[pos] if decoded else None
+                if out:
+                    if logger: logger.add(task_ids[i], "SUCCESS", "Local_AI[batch]", texts[i], out)
+                    results[i] = (out, self.engine_id)
+                else:
+                    results[i] = self.translate(texts[i], task_index, app, logger, task_ids[i], deadline)
+        return results
+
+    def _post(self, payload, timeout):
+        # sync 경로: 공유 requests 세션 사용, 동시 요청 수는 slots로 제한 (리소스 보호)
+        with self.slots:
+            ok = False
+            start = time.monotonic()
+            try:
+                response = self.session.post(self.api_url, json=payload, timeout=timeout)
+                if response.status_code != 200: return None
+                res_json = response.json()
+                ok = True
+                return res_json
+            finally: metrics.observe_request(self.engine_id, time.monotonic() - start, ok)
+
+    async def _post_async(self, session, payload, timeout):
+        # async 경로: 공유 aiohttp 세션(keep-alive 풀) 사용, 동시 요청 수는 async_slots로 제한
+        if self.async_slots is None: self.async_slots = asyncio.Semaphore(self.parallel)
+        async with self.async_slots:
+            ok = False
+            start = time.monotonic()
+            try:
+                async with session.post(self.api_url, json=payload, timeout=aiohttp_timeout(timeout)) as response:
+                    if response.status != 200: return None
+                    res_json = await response.json(content_type=None)
+                    ok = True
+                    return res_json
+            finally: metrics.observe_request(self.engine_id, time.monotonic() - start, ok)
+
+    async def translate_async(self, text, task_index, app, logger, task_id, session, deadline=None):
+        if not self.is_available: return None, None
+        num_predict = None
+        while True:
+            payload = self.build_payload(text, num_predict)
+            try:
+                res_json = await self._post_async(session, payload, call_timeout(60, deadline))
+            except Exception as e:
+                if logger: logger.add(task_id, "ERROR", "Local_AI", text, str(e))
+                return None, None
+            if not res_json: return None, None
+            if self.is_truncated(res_json):
+                num_predict = self.next_predict(payload)
+                if logger: logger.add(task_id, "TRUNCATED", "Local_AI", text, f"num_predict={payload['options']['num_predict']} reached")
+                if num_predict: continue
+                return None, None
+            translated = self.parse_response(res_json)
+            if translated:
+                if logger: logger.add(task_id, "SUCCESS", "Local_AI", text, translated)
+                return translated, self.engine_id
+            return None, None
+
+    async def translate_batch_async(self, texts, task_index, app, logger, task_ids, session, deadline=None):
+        if not self.is_available: return [(None, None)] * len(texts)
+        results = [(None, None)] * len(texts)
+        for group in pack_segments(texts, OLLAMA_BATCH_MAX_CHARS, config.get("batch_max_segments")):
+            decoded, reason = None, "Count mismatch"
+            if len(group) > 1:
+                payload = self.build_batch_payload([texts[i] for i in group])
+                try:
+                    res_json = await self._post_async(session, payload, call_timeout(120, deadline))
+                    if res_json and self.is_truncated(res_json): reason = "Truncated"
+                    elif res_json: decoded = decode_json_list(self.response_text(res_json), len(group))
+                except Exception as e:
+                    if logger: logger.add(task_ids[group[0]], "ERROR", "Local_AI[batch]", payload["messages"][1]["content"], str(e))
+                if decoded is None and logger:
+                    logger.add(task_ids[group[0]], "BATCH_SPLIT", "Local_AI", payload["messages"][1]["content"], f"{reason} -> per-segment")
+            for pos, i in enumerate(group):
+                out = decoded[pos] if decoded else None
+                if out:
+                    if logger: logger.add(task_ids[i], "SUCCESS", "Local_AI[batch]", texts[i], out)
+                    results[i] = (out, self.engine_id)
+                else:
+                    results[i] = await self.translate_async(texts[i], task_index, app, logger, task_ids[i], session, deadline)
+        return results
 
-    def recover_batch(self, text):
-        return self.translate(text, 0, None, None, -1), "Local_AI_Retry"
+    def recovery_engines(self):
+        return [self.engine_id]
+
+    def recover_with(self, engine, text):
+        return self.translate(text, 0, None, None, -1)[0]
 
 # 3. Hybrid Manager (The Brain)
 class HybridBackendManager:
@@ -344,206 +1543,1328 @@ class HybridBackendManager:
         self.local = OllamaBackend()
         # config.json에서 우선순위 로드 (기본값: online)
         self.priority = config.get("backend_priority", "online") 
+        self.checked_at = None
+        self.refreshing = False
+        self.refresh_lock = threading.Lock()
+        self.app = None  # order()에서 Local로 부하가 옮겨갈 때 모델 로드 로그용
 
     def check_health(self, app):
+        # TTL 안의 지난 결과가 있으면 확인 단계를 건너뛰고 백그라운드에서 다시 확인
+        self.app = app
+        self.local.warmed = False
+        cached = self.cached_health()
+        if cached:
+            self.online.apply_health(cached["online"], cached=True)
+            self.local.apply_cached(app, cached["local"])
+            self.checked_at = time.monotonic()
+            app.update_status_text("Engines ready (recent health check).")
+            self.order()  # Local이 primary면 모델 로드 시작
+            self.refresh_in_background(app)
+            return
         app.start_checking_animation()
-        
-        # 1. Check Primary
-        if self.priority == "online":
-            app.update_status_text("Checking Online Translators...")
-            self.online.check_health(app)
-            # 온라인이 불안하면 로컬도 체크해둠 (백업용)
-            if not self.online.active_engines:
-                app.update_status_text("Online unavailable. Checking Local AI...")
-                self.local.check_health(app)
-        else: # Local First
-            app.update_status_text("Checking Local AI...")
-            self.local.check_health(app)
-            # 로컬이 없으면 온라인 체크
-            if not self.local.is_available:
-                app.update_status_text("Local AI unavailable. Checking Online...")
-                self.online.check_health(app)
-
+        app.update_status_text("Checking Online Translators and Local AI...")
+        self.probe_all(app, interactive=True)
+        self.order()
         app.stop_checking_animation()
 
-    def translate(self, text, task_index, app, logger, task_id):
+    def probe_all(self, app, interactive):
+        # 온라인 엔진과 로컬 AI를 동시에 확인 (모델 다운로드는 로컬 우선일 때만 바로 물어봄)
+        local_first = self.priority != "online"
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="health") as side:
+            online = side.submit(self.online.check_health, app)
+            self.local.check_health(app, interactive=interactive and local_first)
+            latencies = online.result()
+        online_ok = any(v is not None for v in latencies.values())
+        if interactive and not local_first and not online_ok and not self.local.is_available:
+            # 온라인 엔진이 모두 실패 -> 로컬 모델이 없으면 다운로드 여부를 물어봄
+            app.update_status_text("Online unavailable. Checking Local AI...")
+            self.local.check_health(app)
+        self.checked_at = time.monotonic()
+        config.set("engine_health_cache", {
+            "checked_at": time.time(), "ollama_url": self.local.base_url, "ollama_model": self.local.model_name,
+            "online": latencies, "local": {"available": self.local.is_available, "parallel": self.local.parallel}})
+
+    def cached_health(self):
+        # 우선 백엔드가 정상이었던 최근 결과만 사용 (로컬 모델 설정이 바뀌었으면 무시)
+        ttl = config.get("health_cache_ttl_sec")
+        cached = config.get("engine_health_cache") or {}
+        if not ttl or not cached.get("online") or time.time() - cached.get("checked_at", 0) > ttl: return None
+        if (cached.get("ollama_url"), cached.get("ollama_model")) != (self.local.base_url, self.local.model_name): return None
+        if self.priority == "online" and not any(v is not None for v in cached["online"].values()): return None
+        if self.priority != "online" and not cached.get("local", {}).get("available"): return None
+        return cached
+
+    def refresh_in_background(self, app):
+        # 번역 중 조용히 재확인 (다운로드 질문 없음) -> 라우팅 / 디스크 캐시 갱신
+        with self.refresh_lock:
+            if self.refreshing: return
+            self.refreshing = True
+        def refresh():
+            try: self.probe_all(app, interactive=False)
+            except Exception as e:
+                if app.debug_mode: app.log_message(f"Background health check failed: {e}", "WARN")
+            finally: self.refreshing = False
+        threading.Thread(target=refresh, daemon=True, name="health-refresh").start()
+
+    def maybe_refresh(self, app):
+        ttl = config.get("health_cache_ttl_sec")
+        if ttl and self.checked_at is not None and time.monotonic() - self.checked_at > ttl: self.refresh_in_background(app)
+
+    def engine_ids(self):
+        # TM 조회 대상 엔진 (우선순위 순)
+        if self.priority == "online": return self.online.engine_ids() + self.local.engine_ids()
+        return self.local.engine_ids() + self.online.engine_ids()
+
+    def order(self):
+        # (primary, secondary) - 온라인 우선이라도 온라인이 degraded 상태면 Local로 부하 이동
+        # Local이 primary가 될 때만 모델을 미리 올림
+        if self.priority != "online" or (self.local.is_available and self.online.is_degraded()):
+            self.local.ensure_warm(self.app)
+            return self.local, self.online
+        return self.online, self.local
+
+    def can_fallback(self, backend):
+        # Online은 항상 시도, Local은 사용 가능할 때만
+        return backend is self.online or self.local.is_available
+
+    def translate(self, text, task_index, app, logger, task_id, deadline=None):
         # 1. Try Primary
-        if self.priority == "online":
-            res = self.online.translate(text, task_index, app, logger, task_id)
-            if res: return res
-            
-            # 2. Fallback to Secondary (Local AI)
-            if self.local.is_available:
-                if app.debug_mode: logger.add(task_id, "FALLBACK", "To_Local", text, "Online Failed")
-                return self.local.translate(text, task_index, app, logger, task_id)
-                
-        else: # Local First
-            res = self.local.translate(text, task_index, app, logger, task_id)
-            if res: return res
-            
-            # 2. Fallback to Secondary (Online)
-            if app.debug_mode: logger.add(task_id, "FALLBACK", "To_Online", text, "Local Failed")
-            return self.online.translate(text, task_index, app, logger, task_id)
-            
-        return None
-
-    def recover_batch(self, text):
-        # 복구 시도: 무조건 둘 다 시도해서 먼저 되는 거 리턴
-        res, eng = self.online.recover_batch(text)
+        primary, secondary = self.order()
+        res, eng = primary.translate(text, task_index, app, logger, task_id, deadline)
         if res: return res, eng
-        
-        res, eng = self.local.recover_batch(text)
+
+        # 2. Fallback to Secondary
+        if self.can_fallback(secondary):
+            if app.debug_mode: logger.add(task_id, "FALLBACK", f"To_{secondary.label}", text, f"{primary.label} Failed")
+            return secondary.translate(text, task_index, app, logger, task_id, deadline)
+        return None, None
+
+    def translate_batch(self, texts, task_index, app, logger, task_ids, deadline=None):
+        primary, secondary = self.order()
+        results = primary.translate_batch(texts, task_index, app, logger, task_ids, deadline)
+        failed = [i for i, (res, _) in enumerate(results) if not res]
+        if failed and self.can_fallback(secondary):
+            if app.debug_mode: logger.add(task_ids[failed[0]], "FALLBACK", f"To_{secondary.label}", texts[failed[0]], f"{len(failed)} batch items failed")
+            retried = secondary.translate_batch([texts[i] for i in failed], task_index, app, logger, [task_ids[i] for i in failed], deadline)
+            for i, res in zip(failed, retried): results[i] = res
+        return results
+
+    async def translate_async(self, text, task_index, app, logger, task_id, session, deadline=None):
+        primary, secondary = self.order()
+        res, eng = await primary.translate_async(text, task_index, app, logger, task_id, session, deadline)
         if res: return res, eng
-        
+        if self.can_fallback(secondary):
+            if app.debug_mode: logger.add(task_id, "FALLBACK", f"To_{secondary.label}", text, f"{primary.label} Failed")
+            return await secondary.translate_async(text, task_index, app, logger, task_id, session, deadline)
         return None, None
 
+    async def translate_batch_async(self, texts, task_index, app, logger, task_ids, session, deadline=None):
+        primary, secondary = self.order()
+        results = await primary.translate_batch_async(texts, task_index, app, logger, task_ids, session, deadline)
+        failed = [i for i, (res, _) in enumerate(results) if not res]
+        if failed and self.can_fallback(secondary):
+            if app.debug_mode: logger.add(task_ids[failed[0]], "FALLBACK", f"To_{secondary.label}", texts[failed[0]], f"{len(failed)} batch items failed")
+            retried = await secondary.translate_batch_async([texts[i] for i in failed], task_index, app, logger, [task_ids[i] for i in failed], session, deadline)
+            for i, res in zip(failed, retried): results[i] = res
+        return results
+
+    def recovery_engines(self):
+        # 우선순위 백엔드의 엔진부터 (Local은 사용 가능할 때만)
+        return [e for backend in self.order() if self.can_fallback(backend) for e in backend.recovery_engines()]
+
+    def recover_with(self, engine, text):
+        backend = self.local if engine == self.local.engine_id else self.online
+        return backend.recover_with(engine, text)
+
 # ===== [Configuration: Active Backend] =====
 # 이제 단일 Backend가 아니라 Hybrid Manager를 사용
-CURRENT_BACKEND = HybridBackendManager()
+CURRENT_BACKEND = None
+backend_lock = threading.Lock()
+
+def get_backend():
+    # 첫 사용(엔진 확인 / 번역) 시 생성
+    global CURRENT_BACKEND
+    if CURRENT_BACKEND is None:
+        with backend_lock:
+            if CURRENT_BACKEND is None: CURRENT_BACKEND = HybridBackendManager()
+    return CURRENT_BACKEND
+
+# ===== [Logic - Async Dispatcher] =====
+# 백그라운드 이벤트 루프 1개에서 모든 번역 코루틴을 실행 (keep-alive 커넥션 풀 공유)
+# submit()은 concurrent.futures.Future를 반환하므로 스레드 경로와 동일하게 결과를 기다릴 수 있음
+def aiohttp_timeout(seconds):
+    import aiohttp
+    return aiohttp.ClientTimeout(total=seconds)
+
+class AsyncDispatcher:
+    def __init__(self, concurrency):
+        self.concurrency = concurrency
+        self.loop = None
+        self.session = None
+        self.slots = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.loop: return
+            import aiohttp  # optional: async 모드에서만 필요
+            loop = asyncio.new_event_loop()
+            # translators 등 동기 API는 루프의 기본 executor에서 실행
+            loop.set_default_executor(ThreadPoolExecutor(max_workers=self.concurrency))
+            self.thread = threading.Thread(target=loop.run_forever, daemon=True)
+            self.thread.start()
+            async def setup():
+                connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+                self.session = aiohttp.ClientSession(connector=connector)
+                self.slots = asyncio.Semaphore(self.concurrency)
+            asyncio.run_coroutine_threadsafe(setup(), loop).result()
+            self.loop = loop
+
+    def submit(self, coro_fn, *args):
+        async def bounded():
+            async with self.slots: return await coro_fn(*args, self.session)
+        return asyncio.run_coroutine_threadsafe(bounded(), self.loop)
+
+    def close(self):
+        with self.lock:
+            if not self.loop: return
+            asyncio.run_coroutine_threadsafe(self.session.close(), self.loop).result(timeout=5)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=5)
+            self.loop = None
+
+async_dispatcher = AsyncDispatcher(config.get("async_concurrency"))
+atexit.register(async_dispatcher.close)
+
+def use_async_mode(app):
+    if config.get("execution_mode") != "async": return False
+    try:
+        async_dispatcher.start()
+        return True
+    except ImportError:
+        app.log_message("aiohttp not installed. Falling back to thread mode.", "WARN")
+        return False
+
+# ===== [Helper(Profiling)] =====
+# config profile_mode (CLI --profile, GUI Profile 체크박스가 이번 세션에만 켬)에서 파일별 cProfile / tracemalloc / 스레드 상태 샘플링
+# 결과: profile_<파일명>.prof (snakeviz 등) + profile_<파일명>.txt (상위 함수 / 메모리 할당 상위 N / 스레드 상태)
+# 파일별로 분리해 측정하도록 profiling 중에는 문서를 한 번에 하나씩 처리
+# Python 3.12+ 의 cProfile은 sys.monitoring 기반이라 모든 스레드를 함께 측정 -> 워커별 프로파일은 3.11 이하에서만
+WORKER_PROFILES = sys.version_info < (3, 12)
+IO_MODULES = ("socket.py", "ssl.py", "selectors.py", "http/client.py", "urllib3/", "requests/", "aiohttp/", "asyncio/")
+
+def profiling_enabled():
+    return bool(config.get("profile_mode"))
+
+class ThreadSampler:
+    # 일정 간격으로 모든 스레드의 현재 프레임을 보고 running / lock / wait / io / sleep / idle 로 분류
+    # wait: Future 결과 대기, lock: 그 외 Lock / Condition / Semaphore 대기
+    # lock 대기가 많은 위치(LifecycleManager / FileLogger / Ollama slots 등)를 site 별로 집계
+    def __init__(self, interval):
+        self.interval = interval
+        self.states = {}   # thread group -> {state: count}
+        self.threads = {}  # thread group -> set(ident)
+        self.sites = {}    # (state, site) -> count
+        self.samples = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.scheduler_ident = threading.get_ident()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="ProfileSampler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread: self.thread.join()
+
+    def run(self):
+        names = {}
+        while not self.stop_event.wait(self.interval):
+            for t in threading.enumerate(): names[t.ident] = t.name
+            self.samples += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == self.thread.ident: continue
+                group = "scheduler" if ident == self.scheduler_ident else re.sub(r"_\d+$", "", names.get(ident, "?"))
+                state, site = self.classify(frame)
+                self.threads.setdefault(group, set()).add(ident)
+                counts = self.states.setdefault(group, {})
+                counts[state] = counts.get(state, 0) + 1
+                if site and state in ("lock", "wait", "io", "sleep"): self.sites[(state, site)] = self.sites.get((state, site), 0) + 1
+
+    @staticmethod
+    def classify(frame):
+        import linecache
+        top = frame
+        filename = top.f_code.co_filename.replace("\\", "/")
+        if filename.endswith("concurrent/futures/thread.py") and top.f_code.co_name == "_worker": return "idle", None
+        # 이 파일 안의 가장 가까운 호출 위치 (site)
+        site_frame = frame
+        while site_frame and site_frame.f_code.co_filename != __file__: site_frame = site_frame.f_back
+        site = None
+        if site_frame:
+            code = site_frame.f_code
+            site = f"{getattr(code, 'co_qualname', code.co_name)}:{site_frame.f_lineno}  {linecache.getline(code.co_filename, site_frame.f_lineno).strip()}"
+        line = linecache.getline(top.f_code.co_filename, top.f_lineno)
+        if any(m in filename for m in IO_MODULES): return "io", site
+        if filename.endswith("threading.py") or filename.endswith("queue.py"):
+            if site_frame is None: return "idle", site
+            caller = frame
+            while caller and caller is not site_frame:
+                if "concurrent/futures" in caller.f_code.co_filename.replace("\\", "/"): return "wait", site
+                caller = caller.f_back
+            return "lock", site
+        if "sleep(" in line: return "sleep", site
+        if top is site_frame and any(k in line for k in ("lock", "slots", "acquire")): return "lock", site
+        return "running", site
+
+    def report(self, top_n):
+        lines = [f"=== Thread states (every {self.interval * 1000:.0f}ms, {self.samples} samples) ==="]
+        for group, counts in sorted(self.states.items()):
+            total = sum(counts.values()) or 1
+            shares = "  ".join(f"{state} {counts.get(state, 0) / total:5.1%}" for state in ("running", "lock", "wait", "io", "sleep", "idle"))
+            lines.append(f"{group:<28} x{len(self.threads[group]):<3} {shares}")
+        lines.append("")
+        lines.append("=== Top waiting sites (samples) ===")
+        for (state, site), n in sorted(self.sites.items(), key=lambda kv: -kv[1])[:top_n]:
+            lines.append(f"{n:6d}  {state:<5}  {site}")
+        return lines
+
+class FileProfiler:
+    def __init__(self, base_path):
+        self.base_path = base_path  # 확장자 없는 경로: <폴더>/profile_<파일명>
+        self.top_n = config.get("profile_top_n")
+        self.worker_profiles = []
+        self.lock = threading.Lock()
+
+    def start(self):
+        import cProfile, tracemalloc
+        self.started_tracemalloc = not tracemalloc.is_tracing()
+        if self.started_tracemalloc: tracemalloc.start()
+        self.baseline = tracemalloc.take_snapshot()
+        self.sampler = ThreadSampler(config.get("profile_sample_interval"))
+        self.sampler.start()
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def call(self, fn, *args):
+        # 워커 스레드에서 작업 하나를 별도 Profile로 실행 (3.11 이하)
+        if not WORKER_PROFILES: return fn(*args)
+        import cProfile
+        profile = cProfile.Profile()
+        try: return profile.runcall(fn, *args)
+        finally:
+            with self.lock: self.worker_profiles.append(profile)
+
+    def stop(self):
+        import io, pstats, tracemalloc
+        self.profile.disable()
+        self.sampler.stop()
+        # 샘플러의 소스 읽기(linecache) / import 자체 할당은 제외
+        ignore = [tracemalloc.Filter(False, pattern) for pattern in ("*linecache.py", "*tracemalloc.py", "<frozen importlib.*")]
+        snapshot = tracemalloc.take_snapshot().filter_traces(ignore)
+        self.baseline = self.baseline.filter_traces(ignore)
+        if self.started_tracemalloc: tracemalloc.stop()
+        with self.lock: stats = pstats.Stats(self.profile, *self.worker_profiles)
+        stats.dump_stats(f"{self.base_path}.prof")
+
+        out = io.StringIO()
+        stats.stream = out
+        stats.sort_stats("cumulative").print_stats(self.top_n)
+        lines = [f"=== {APP_NAME} profile ({datetime.datetime.now()}) ===", out.getvalue().strip(), ""]
+        lines.append(f"=== Top {self.top_n} allocations since open (tracemalloc) ===")
+        for stat in snapshot.compare_to(self.baseline, "lineno")[:self.top_n]: lines.append(str(stat))
+        lines.append("")
+        lines.extend(self.sampler.report(self.top_n))
+        with open(f"{self.base_path}.txt", 'w', encoding='utf-8') as f: f.write("\n".join(lines) + "\n")
+        return f"{self.base_path}.txt"
 
 # ===== [Logic - Core Processing] =====
 # 기존 로직과 100% 동일
 
 def check_engine_health(app):
-    CURRENT_BACKEND.check_health(app)
-
-def translate_logic(text, task_index, app, logger, task_id):
-    return CURRENT_BACKEND.translate(text, task_index, app, logger, task_id)
+    get_backend().check_health(app)
+
+def translate_logic(text, task_index, app, logger, task_id, deadline=None):
+    return get_backend().translate(text, task_index, app, logger, task_id, deadline)
+
+def normalize_bullet(text):
+    # 한글/원문자 글머리표를 영문으로 치환 (가. -> A.)
+    pattern = r"^\s*([가-하ㄱ-ㅎ①-⑮])(\.|(?:\))|(?:\s))\s+(.*)"
+    match = re.match(pattern, text)
+    if match:
+        bullet_char = match.group(1)
+        content = text[len(bullet_char):].strip()
+        if content.startswith(".") or content.startswith(")"): content = content[1:].strip()
+        if bullet_char in HAN_TO_ENG_MAP:
+            eng_bullet = HAN_TO_ENG_MAP[bullet_char]
+            return f"{eng_bullet}. {content}"
+    return text
+
+# 한국어 문장 끝: 한글 + 마침표/물음표/느낌표 (닫는 따옴표·괄호 포함) 뒤의 공백
+# "A." / "1." 같은 글머리표나 번호 뒤에서는 나누지 않음
+SENTENCE_END = re.compile(r"(?<=[가-힣][.!?])[\"'”’)\]]*\s+")
+
+def sentence_units(text, max_chars):
+    # (문장, 뒤 구분자) - 구분자는 줄바꿈이 있으면 "\n", 아니면 " " (마지막은 "")
+    # max_chars보다 긴 문장은 공백에서, 공백이 없으면 그 자리에서 자름
+    pos = 0
+    matches = list(SENTENCE_END.finditer(text))
+    for i in range(len(matches) + 1):
+        if i < len(matches):
+            end = matches[i].start() + len(matches[i].group().rstrip())
+            sentence, sep, pos_next = text[pos:end], "\n" if "\n" in matches[i].group() else " ", matches[i].end()
+        else: sentence, sep, pos_next = text[pos:], "", len(text)
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", max_chars // 2, max_chars)
+            if cut < 0: yield sentence[:max_chars], ""; sentence = sentence[max_chars:]
+            else: yield sentence[:cut], " "; sentence = sentence[cut:].lstrip(" ")
+        yield sentence, sep
+        pos = pos_next
+
+def split_paragraph(text, max_chars):
+    # 긴 문단을 max_chars 이하 조각으로 -> [(앞 구분자, 조각)], 첫 조각의 구분자는 ""
+    chunks, current, current_sep, pending_sep = [], "", "", ""
+    for unit, sep in sentence_units(text, max_chars):
+        if current and len(current) + len(pending_sep) + len(unit) > max_chars:
+            chunks.append((current_sep, current))
+            current, current_sep = unit, pending_sep
+        else: current = f"{current}{pending_sep}{unit}" if current else unit
+        pending_sep = sep
+    if current: chunks.append((current_sep, current))
+    return chunks
+
+def remember_translation(text, engine, result):
+    if engine: translation_memory.store(glossary.tm_key(text), engine, result)
+
+def protect_terms(task_info, text):
+    # 문장 안의 용어집 용어 -> {{n}} (번역 후 glossary.restore로 되돌림)
+    protected, terms = glossary.protect(text)
+    if terms: task_info['lifecycle'].count("GLOSSARY_TERMS", len(terms))
+    return protected, terms
+
+def translate_batch_logic(texts, task_index, app, logger, task_ids, deadline=None):
+    return get_backend().translate_batch(texts, task_index, app, logger, task_ids, deadline)
+
+def prepare_task(task_info, app, logger):
+    # 번역이 필요 없으면 (SKIPPED / TM hit) 여기서 상태를 확정하고 None 반환
+    task_id, lifecycle = task_info['id'], task_info['lifecycle']
+    text = task_info['text'].strip()
+    if not text: 
+        lifecycle.update_status(task_id, "SKIPPED")
+        return None
+    if not is_korean_present(text): 
+        if app.debug_mode: logger.add(task_id, "SKIPPED", "-", text, "(No Korean)")
+        lifecycle.update_status(task_id, "SKIPPED")
+        return None
+    if is_already_translated_strict(text): 
+        if app.debug_mode: logger.add(task_id, "SKIPPED", "-", text, "(Already Translated)")
+        lifecycle.update_status(task_id, "SKIPPED")
+        return None 
+
+    # 긴 문단의 조각은 나누기 전에 이미 글머리표를 치환함
+    text_to_translate = text if 'parent' in task_info else normalize_bullet(text)
+
+    # 0. 용어집만으로 번역되는 문단은 요청 없이 처리
+    local = glossary.translate_local(text_to_translate)
+    if local:
+        lifecycle.count("GLOSSARY_HIT")
+        lifecycle.update_status(task_id, "SUCCESS", local)
+        if app.debug_mode: logger.add(task_id, "GLOSSARY", "Glossary", text, local)
+        return None
 
-def aggressive_recovery_translate(text):
-    return CURRENT_BACKEND.recover_batch(text)
+    # 1. Translation Memory 조회
+    cached, cached_engine = translation_memory.lookup(glossary.tm_key(text_to_translate), get_backend().engine_ids())
+    if cached:
+        lifecycle.count("TM_HIT")
+        lifecycle.update_status(task_id, "SUCCESS", cached)
+        if app.debug_mode: logger.add(task_id, "CACHED", f"TM({cached_engine})", text, cached)
+        return None
+    if translation_memory.enabled: lifecycle.count("TM_MISS")
+    return text_to_translate
+
+def finish_task(task_info, text_to_translate, result, engine, app):
+    task_id, lifecycle = task_info['id'], task_info['lifecycle']
+    if result:
+        remember_translation(text_to_translate, engine, result)
+        lifecycle.update_status(task_id, "SUCCESS", result)
+        if app.debug_mode: app.log_message(f"[ID:{task_id}] 1st Attempt Success")
+    else:
+        lifecycle.update_status(task_id, "FAILED")
+        if app.debug_mode: app.log_message(f"[ID:{task_id}] 1st Attempt Failed -> Queued", "WARN")
 
 def smart_translate(task_info, app, logger):
-    task_id = task_info['id']
-    lifecycle_manager.update_status(task_id, "IN_PROGRESS")
+    task_id, lifecycle = task_info['id'], task_info['lifecycle']
+    lifecycle.update_status(task_id, "IN_PROGRESS")
     try:
-        text = task_info['text']
-        idx = task_info['index']
-        text = text.strip()
-        if not text: 
-            lifecycle_manager.update_status(task_id, "SKIPPED")
-            return None
-        if not is_korean_present(text): 
-            if app.debug_mode: logger.add(task_id, "SKIPPED", "-", text, "(No Korean)")
-            lifecycle_manager.update_status(task_id, "SKIPPED")
-            return None
-        if is_already_translated_strict(text): 
-            if app.debug_mode: logger.add(task_id, "SKIPPED", "-", text, "(Already Translated)")
-            lifecycle_manager.update_status(task_id, "SKIPPED")
-            return None 
-
-        pattern = r"^\s*([가-하ㄱ-ㅎ①-⑮])(\.|(?:\))|(?:\s))\s+(.*)"
-        match = re.match(pattern, text)
-        text_to_translate = text
-        if match:
-            bullet_char = match.group(1)
-            content = text[len(bullet_char):].strip()
-            if content.startswith(".") or content.startswith(")"): content = content[1:].strip()
-            if bullet_char in HAN_TO_ENG_MAP:
-                eng_bullet = HAN_TO_ENG_MAP[bullet_char]
-                text_to_translate = f"{eng_bullet}. {content}"
-
-        result = translate_logic(text_to_translate, idx, app, logger, task_id)
-        if result:
-            lifecycle_manager.update_status(task_id, "SUCCESS", result)
-            if app.debug_mode: app.log_message(f"[ID:{task_id}] 1st Attempt Success")
-        else:
-            lifecycle_manager.update_status(task_id, "FAILED")
-            if app.debug_mode: app.log_message(f"[ID:{task_id}] 1st Attempt Failed -> Queued", "WARN")
+        text_to_translate = prepare_task(task_info, app, logger)
+        if text_to_translate is None: return None
+        protected, terms = protect_terms(task_info, text_to_translate)
+        result, engine = translate_logic(protected, task_info['index'], app, logger, task_id, task_info.get('deadline'))
+        finish_task(task_info, text_to_translate, glossary.restore(result, terms), engine, app)
     except Exception as e:
-        logger.add(task_id, "ERROR", "CRASH", text, str(e))
-        lifecycle_manager.update_status(task_id, "FAILED")
-
-def run_process_thread(input_path, app):
-    filename = os.path.basename(input_path)
-    try: doc = Document(input_path)
+        logger.add(task_id, "ERROR", "CRASH", task_info['text'], str(e))
+        lifecycle.update_status(task_id, "FAILED")
+
+def smart_translate_batch(batch, app, logger):
+    # 짧은 문단 묶음: 전처리/TM 조회는 개별로, 번역 요청만 묶어서 전송
+    pending = []
+    for task_info in batch:
+        task_id, lifecycle = task_info['id'], task_info['lifecycle']
+        lifecycle.update_status(task_id, "IN_PROGRESS")
+        try:
+            text_to_translate = prepare_task(task_info, app, logger)
+            if text_to_translate is not None: pending.append((task_info, text_to_translate))
+        except Exception as e:
+            logger.add(task_id, "ERROR", "CRASH", task_info['text'], str(e))
+            lifecycle.update_status(task_id, "FAILED")
+    if not pending: return None
+    protected = [protect_terms(info, t) for info, t in pending]
+    texts = [p for p, _ in protected]
+    task_ids = [info['id'] for info, _ in pending]
+    try:
+        results = translate_batch_logic(texts, pending[0][0]['index'], app, logger, task_ids, batch[0].get('deadline'))
     except Exception as e:
-        app.log_message(f"File Open Error ({filename}): {e}", "FATAL")
-        return None
+        logger.add(task_ids[0], "ERROR", "CRASH", "\n".join(texts), str(e))
+        results = [(None, None)] * len(pending)
+    for (info, text_to_translate), (_, terms), (result, engine) in zip(pending, protected, results):
+        finish_task(info, text_to_translate, glossary.restore(result, terms), engine, app)
+
+async def smart_translate_async(task_info, app, logger, session):
+    task_id, lifecycle = task_info['id'], task_info['lifecycle']
+    lifecycle.update_status(task_id, "IN_PROGRESS")
+    try:
+        text_to_translate = prepare_task(task_info, app, logger)
+        if text_to_translate is None: return None
+        protected, terms = protect_terms(task_info, text_to_translate)
+        result, engine = await get_backend().translate_async(protected, task_info['index'], app, logger, task_id, session, task_info.get('deadline'))
+        finish_task(task_info, text_to_translate, glossary.restore(result, terms), engine, app)
+    except Exception as e:
+        logger.add(task_id, "ERROR", "CRASH", task_info['text'], str(e))
+        lifecycle.update_status(task_id, "FAILED")
+
+async def smart_translate_batch_async(batch, app, logger, session):
+    pending = []
+    for task_info in batch:
+        task_id, lifecycle = task_info['id'], task_info['lifecycle']
+        lifecycle.update_status(task_id, "IN_PROGRESS")
+        try:
+            text_to_translate = prepare_task(task_info, app, logger)
+            if text_to_translate is not None: pending.append((task_info, text_to_translate))
+        except Exception as e:
+            logger.add(task_id, "ERROR", "CRASH", task_info['text'], str(e))
+            lifecycle.update_status(task_id, "FAILED")
+    if not pending: return None
+    protected = [protect_terms(info, t) for info, t in pending]
+    texts = [p for p, _ in protected]
+    task_ids = [info['id'] for info, _ in pending]
+    try:
+        results = await get_backend().translate_batch_async(texts, pending[0][0]['index'], app, logger, task_ids, session, batch[0].get('deadline'))
+    except Exception as e:
+        logger.add(task_ids[0], "ERROR", "CRASH", "\n".join(texts), str(e))
+        results = [(None, None)] * len(pending)
+    for (info, text_to_translate), (_, terms), (result, engine) in zip(pending, protected, results):
+        finish_task(info, text_to_translate, glossary.restore(result, terms), engine, app)
+
+def chunk_tasks(task, max_chars):
+    # 긴 문단 -> 같은 LifecycleManager 항목 아래의 조각 작업들 (각각 별도 작업으로 동시에 번역)
+    # 번역할 필요 없는 문단은 그대로 두어 prepare_task에서 SKIPPED 처리
+    text = task['text'].strip()
+    if not max_chars or len(text) <= max_chars: return None
+    if not is_korean_present(text) or is_already_translated_strict(text): return None
+    chunks = split_paragraph(normalize_bullet(text), max_chars)
+    if len(chunks) < 2: return None
+    separators, texts = zip(*chunks)
+    chunk_ids = task['lifecycle'].register_chunks(task['id'], separators, texts)
+    return [{**task, 'id': chunk_id, 'text': chunk, 'index': task['index'] + k, 'parent': task}
+            for k, (chunk_id, chunk) in enumerate(zip(chunk_ids, texts))]
+
+def iter_jobs(tasks):
+    # 짧은 한 줄 문단은 배치로, 긴 문단은 조각으로, 나머지는 개별 작업으로 (제출 순서 유지, 스트리밍)
+    batching = config.get("batch_enabled")
+    max_chars, max_count = config.get("batch_segment_max_chars"), config.get("batch_max_segments")
+    chunk_max = config.get("chunk_max_chars")
+    batch = []
+    for task in tasks:
+        text = task['text'].strip()
+        chunks = chunk_tasks(task, chunk_max)
+        if chunks:
+            for chunk in chunks: yield [chunk]
+        elif batching and len(text) <= max_chars and "\n" not in text:
+            batch.append(task)
+            if len(batch) >= max_count:
+                yield batch
+                batch = []
+        else: yield [task]
+    if batch: yield batch
+
+# 작업 함수들은 소요 시간(초)을 반환 -> 단계별 시간 / 워커 사용률 집계
+def run_job(job, app, logger):
+    start = time.monotonic()
+    if len(job) == 1: smart_translate(job[0], app, logger)
+    else: smart_translate_batch(job, app, logger)
+    return time.monotonic() - start
+
+async def run_job_async(job, app, logger, session):
+    start = time.monotonic()
+    if len(job) == 1: await smart_translate_async(job[0], app, logger, session)
+    else: await smart_translate_batch_async(job, app, logger, session)
+    return time.monotonic() - start
+
+def recover_task(task, logger, recovery):
+    start = time.monotonic()
+    tid, orig_text, lifecycle = task['id'], task['text'], task['lifecycle']
+    text_to_translate = orig_text.strip() if 'parent' in task else normalize_bullet(orig_text.strip())
+    # 1차 번역과 같이 용어를 보호 (자리표시자가 깨진 결과는 실패로 보고 다른 엔진으로)
+    protected, terms = glossary.protect(text_to_translate)
+    res, eng = recovery.translate(protected, lambda r: glossary.restore(r, terms))
+    if res:
+        remember_translation(text_to_translate, eng, res)
+        lifecycle.update_status(tid, "SUCCESS", res)
+        lifecycle.count("RECOVERED")
+        logger.add(tid, "RECOVERED", f"{eng}(Recovery)", orig_text, res)
+    else:
+        lifecycle.count("FINAL_FAIL")
+        logger.add(tid, "FINAL_FAIL", "All", orig_text, "FINAL FAIL")
+    return time.monotonic() - start
+
+WML_NS = {"w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+          "mc": "http://schemas.openxmlformats.org/markup-compatibility/2006"}
+STORY_CONTENT_TYPES = ("header+xml", "footer+xml", "footnotes+xml", "endnotes+xml")
+# python-docx Paragraph.text와 같은 규칙 (run / hyperlink 안의 run, 탭·줄바꿈 포함)
+PARAGRAPH_TEXT_XPATH = " | ".join(f"{parent}w:r/w:{tag}" for parent in ("", "w:hyperlink/")
+                                  for tag in ("br", "cr", "noBreakHyphen", "ptab", "t", "tab"))
+story_xpaths = {}
+W_BR, W_TAB, W_T = (f"{{{WML_NS['w']}}}{tag}" for tag in ("br", "tab", "t"))
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+def story_xpath(name):
+    # XPath는 처음 쓸 때 한 번만 컴파일 (python-docx의 element.xpath는 호출마다 컴파일)
+    if not story_xpaths:
+        story_xpaths.update(
+            paragraphs=lxml_etree.XPath(".//w:p[not(ancestor::mc:Fallback)]", namespaces=WML_NS),
+            table_paragraphs=lxml_etree.XPath(".//w:tbl//w:p", namespaces=WML_NS),
+            text=lxml_etree.XPath(PARAGRAPH_TEXT_XPATH, namespaces=WML_NS))
+    return story_xpaths[name]
+
+def story_parts(doc):
+    # 번역 대상 XML 파트: 본문 + 머리글/바닥글 + 각주/미주 -> [(part, root, detached)]
+    # python-docx가 모델링하지 않는 파트(각주/미주)는 blob을 직접 파싱하고 저장 전에 되돌려 씀 (detached)
+    parts = [(doc.part, doc.part.element, False)]
+    for part in doc.part.package.iter_parts():
+        if part is doc.part or not part.content_type.endswith(STORY_CONTENT_TYPES): continue
+        if hasattr(part, "element"): parts.append((part, part.element, False))
+        else: parts.append((part, docx_oxml.parse_xml(part.blob), True))
+    return parts
+
+def store_story_parts(parts):
+    for part, root, detached in parts:
+        if detached: part._blob = docx_opc_oxml.serialize_part_xml(root)
+
+def copy_zip_entry(src, dst, info):
+    # 압축된 바이트를 그대로 복사 (압축 해제 / 재압축 없음)
+    import struct
+    src.fp.seek(info.header_offset)
+    name_len, extra_len = struct.unpack("<26xHH", src.fp.read(30))
+    src.fp.seek(name_len + extra_len, os.SEEK_CUR)
+    raw = src.fp.read(info.compress_size)
+    entry = copy.copy(info)
+    entry.flag_bits &= ~0x08  # data descriptor 대신 로컬 헤더에 CRC / 크기 기록
+    entry.extra = b""
+    entry.header_offset = dst.fp.tell()
+    dst.fp.write(entry.FileHeader())
+    dst.fp.write(raw)
+    dst.start_dir = dst.fp.tell()
+    dst.filelist.append(entry)
+    dst.NameToInfo[entry.filename] = entry
+
+def save_passthrough(src_path, out_path, parts):
+    # 원본 .docx를 순서대로 스트리밍: 번역을 써 넣은 story 파트만 다시 직렬화, 나머지는 바이트 그대로
+    import zipfile
+    changed = {str(part.partname).lstrip("/"): part.blob for part, root, detached in parts}
+    with zipfile.ZipFile(src_path) as src, zipfile.ZipFile(out_path, "w") as dst:
+        if src.comment: dst.comment = src.comment
+        for info in src.infolist():
+            if info.filename in changed:
+                dst.writestr(copy.copy(info), changed.pop(info.filename), compress_type=zipfile.ZIP_DEFLATED)
+            else: copy_zip_entry(src, dst, info)
+    if changed: raise ValueError(f"parts missing from {src_path}: {', '.join(changed)}")
+
+def save_document(doc, parts, src_path, out_path, passthrough):
+    store_story_parts(parts)
+    if passthrough:
+        try: return save_passthrough(src_path, out_path, parts)
+        except Exception as e:
+            # 원본 zip 구조가 예상과 다르면 python-docx 전체 저장으로
+            print(f"Pass-through save failed ({e}), saving the whole package.", file=sys.stderr)
+            if os.path.exists(out_path): os.remove(out_path)
+    doc.save(out_path)
 
-    log_file_path = os.path.join(os.path.dirname(input_path), f"log_{filename}.txt")
-    logger = FileLogger(log_file_path)
-    global lifecycle_manager
-    lifecycle_manager = LifecycleManager()
-    
-    tasks = []
-    seen = set()
-    counter = 1
-
-    def collect_task(para, is_tbl):
-        nonlocal counter
-        pid = para._element
-        if pid in seen: return
-        seen.add(pid)
-        if para.text.strip():
-            task_id = counter
-            lifecycle_manager.register(task_id, para.text)
-            tasks.append({'obj': para, 'text': para.text, 'is_table': is_tbl, 'index': len(tasks), 'id': task_id})
-            counter += 1
-
-    for para in doc.paragraphs: collect_task(para, False)
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                for para in cell.paragraphs: collect_task(para, True)
-    
-    total = len(tasks)
-    app.log_message(f"[{filename}] Analysis done: {total} items.")
-    app.update_progress(0, total, filename)
-    
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        future_to_idx = {executor.submit(smart_translate, t, app, logger): i for i, t in enumerate(tasks)}
-        completed = 0
-        for future in future_to_idx:
-            try: future.result() 
-            except: pass
-            completed += 1
-            app.update_progress(completed, total, filename)
-
-    failed_items = lifecycle_manager.get_failed_tasks()
-    if failed_items:
-        app.log_message(f"🚨 [{filename}] {len(failed_items)} items failed. Recovery started...", "WARN")
-        for tid, orig_text in failed_items:
-            res, eng = aggressive_recovery_translate(orig_text)
-            if res:
-                lifecycle_manager.update_status(tid, "SUCCESS", res)
-                logger.add(tid, "RECOVERED", f"{eng}(Recovery)", orig_text, res)
+def iter_paragraphs(parts):
+    # 파트마다 XPath 한 번으로 모든 w:p (중첩 표, 텍스트 상자 포함) - 문서 순서, 요소당 한 번
+    # mc:Fallback은 mc:Choice(텍스트 상자 등)의 구버전 사본이라 제외
+    for part, root, detached in parts:
+        in_table = set(story_xpath("table_paragraphs")(root))
+        for p in story_xpath("paragraphs")(root):
+            yield p, p in in_table
+
+def iter_segments(parts):
+    # 내용이 있는 문단만 (w:p, 텍스트, 표 안 여부) - 텍스트는 여기서 한 번만 계산
+    text_nodes = story_xpath("text")
+    for p, is_tbl in iter_paragraphs(parts):
+        text = "".join(map(str, text_nodes(p)))
+        if text.strip(): yield p, text, is_tbl
+
+def iter_tasks(segments, deadline, lifecycle):
+    # 문단을 읽는 즉시 작업으로 등록 (process 모드에서는 w:p 대신 None - 결과는 index로 되돌려 씀)
+    for index, (p, text, is_tbl) in enumerate(segments):
+        task_id = index + 1
+        lifecycle.register(task_id, text)
+        yield {'obj': p, 'text': text, 'is_table': is_tbl, 'index': index, 'id': task_id, 'deadline': deadline, 'lifecycle': lifecycle}
+
+# document_mode "process": 문서 열기 / 추출 / write-back / 저장을 프로세스 풀에서
+# 자식 프로세스는 상태를 유지하지 않으므로 저장할 때 원본을 다시 열어 같은 순서로 추출한 뒤 index로 결과를 씀
+def extract_document(path):
+    start = time.monotonic()
+    doc = docx.Document(path)
+    opened = time.monotonic()
+    segments = [(text, is_tbl) for p, text, is_tbl in iter_segments(story_parts(doc))]
+    return segments, {"open": opened - start, "collect": time.monotonic() - opened}
+
+def write_document(src_path, out_path, results, passthrough):
+    start = time.monotonic()
+    doc = docx.Document(src_path)
+    parts = story_parts(doc)
+    for index, (p, text, is_tbl) in enumerate(iter_segments(parts)):
+        if results.get(index): write_back({'obj': p, 'text': text, 'is_table': is_tbl}, results[index])
+    written = time.monotonic()
+    save_document(doc, parts, src_path, out_path, passthrough)
+    return {"write_back": written - start, "save": time.monotonic() - written}
+
+run_templates = {}
+
+def run_template(is_table):
+    # 번역문 run 서식 (기울임 + APPEND_COLOR, 표 안은 8pt) - 서식별로 한 번만 만들고 결과마다 복제
+    if is_table not in run_templates:
+        size = '<w:sz w:val="16"/>' if is_table else ''
+        run_templates[is_table] = docx_oxml.parse_xml(
+            f'<w:r xmlns:w="{WML_NS["w"]}"><w:rPr><w:i/><w:color w:val="{"%02X%02X%02X" % APPEND_COLOR}"/>{size}</w:rPr></w:r>')
+    return run_templates[is_table]
+
+def append_run(p, template, text):
+    # python-docx run.text 와 같은 변환: \n -> w:br, \t -> w:tab, 나머지는 w:t (앞뒤 공백이 있으면 보존)
+    r = copy.deepcopy(template)
+    for i, line in enumerate(text.split("\n")):
+        if i: lxml_etree.SubElement(r, W_BR)
+        for j, chunk in enumerate(line.split("\t")):
+            if j: lxml_etree.SubElement(r, W_TAB)
+            if chunk:
+                t = lxml_etree.SubElement(r, W_T)
+                t.text = chunk
+                if chunk != chunk.strip(): t.set(XML_SPACE, "preserve")
+    p.append(r)
+
+def write_back(task, res):
+    # 추출 시 계산한 원문으로 판단 (문단 텍스트를 다시 읽지 않음)
+    if is_already_translated_strict(task['text']): return
+    if task['is_table']: append_run(task['obj'], run_template(True), f"\n{res}")
+    else: append_run(task['obj'], run_template(False), f" ({res})")
+
+def snapshot_backend_stats():
+    backend = get_backend()
+    return {"hedge": backend.online.hedge.snapshot(), "generation": backend.local.stats.snapshot(),
+            "engines": metrics.snapshot_engines()}
+
+def report_backend_stats(start, filename, app, logger):
+    # 파일 단위 엔진 통계를 로그 Notes / 앱 로그에 남기고 summary에 넣을 dict 반환
+    backend = get_backend()
+    rate_limits = backend.online.get_rate_limits()
+    backend.online.save_rate_limits()
+    limits_text = ", ".join(f"{eng} {v['rate']}/s x{v['window']}" for eng, v in rate_limits.items())
+    logger.add_note(f"Rate limits: {limits_text}")
+    app.log_message(f"[{filename}] Rate limits: {limits_text}")
+    hedge_stats = {k: v - start["hedge"][k] for k, v in backend.online.hedge.snapshot().items()}
+    logger.add_note(f"Hedging: {hedge_stats['hedges']} hedges / {hedge_stats['requests']} requests, {hedge_stats['wins']} won by the hedge")
+    generation = GenerationStats.describe(start["generation"], backend.local.stats.snapshot())
+    if generation["requests"]:
+        generation_text = (f"{generation['requests']} requests, first token {generation['avg_first_token_ms']}ms avg, "
+                           f"{generation['tokens_per_sec']} tokens/s, {generation['avg_prompt_tokens']} prompt tokens avg")
+        logger.add_note(f"Local AI: {generation_text}")
+        app.log_message(f"[{filename}] Local AI: {generation_text}")
+    engine_health = backend.online.get_engine_health()
+    for eng, h in engine_health.items():
+        latency = f"{h['latency']}s" if h['latency'] is not None else "n/a"
+        logger.add_note(f"Engine {eng}: {h['state']}, EWMA latency {latency}, error rate {h['error_rate']:.0%}")
+    return {"RATE_LIMITS": rate_limits, "ENGINE_HEALTH": engine_health, "HEDGING": hedge_stats, "LOCAL_AI": generation,
+            "ENGINES": Metrics.describe_engines(start["engines"], metrics.snapshot_engines())}
+
+def export_file_metrics(input_path, summary):
+    # 파일별 JSON 리포트: metrics_<파일명>.json (로그와 같은 폴더)
+    if not config.get("metrics_json"): return
+    path = os.path.join(os.path.dirname(input_path), f"metrics_{os.path.basename(input_path)}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"file": os.path.abspath(input_path), "version": CURRENT_VERSION, **summary}, f, indent=2, ensure_ascii=False)
+
+def record_file_metrics(summary, stages):
+    metrics.add_file(summary, stages)
+    prom_path = config.get("metrics_prom_path")
+    if prom_path:
+        try: metrics.write_prometheus(prom_path)
+        except OSError as e: print(f"Metrics export failed: {e}", file=sys.stderr)
+
+class DocumentRun:
+    # 배치 안의 문서 하나: 열린 문서, 로그, 작업 상태(LifecycleManager), 진행률을 파일별로 보관
+    def __init__(self, input_path, num, total_files, app):
+        self.input_path = input_path
+        self.filename = os.path.basename(input_path)
+        self.num = num
+        self.label = f"[{num}/{total_files}] {self.filename}"
+        self.app = app
+        self.doc = None
+        self.parts = None
+        self.jobs = None
+        self.exhausted = False
+        self.outstanding = 0
+        self.total = 0
+        self.completed = 0
+        self.recovering = False
+        self.started = time.monotonic()
+        self.stages = StageTimer()
+        self.queue_max = 0
+        self.profiler = None
+        self.results = None  # process 모드: 문단 index -> 번역 결과 (저장 시 자식 프로세스로 전달)
+
+    def open(self, profiling=False, extraction=None):
+        # extraction: process 모드에서 미리 제출해 둔 extract_document future
+        self.app.log_message(f"=== Processing {self.label} ===", "SUCCESS")
+        self.app.update_progress(0, 100, self.label)
+        if profiling:
+            self.profiler = FileProfiler(os.path.join(os.path.dirname(self.input_path), f"profile_{self.filename}"))
+            self.profiler.start()
+        start = time.monotonic()
+        try:
+            if extraction is None:
+                self.doc = docx.Document(self.input_path)
+                self.stages.add("open", time.monotonic() - start)
             else:
-                logger.add(tid, "FINAL_FAIL", "All", orig_text, "FINAL FAIL")
-    
-    app.log_message(f"[{filename}] Saving file...")
-    saved_log_path = logger.save()
-    
-    for task in tasks:
-        task_id = task['id']
-        info = lifecycle_manager.tracking_table.get(task_id)
+                # 자식 프로세스에서 잰 열기 / 추출 시간 (부모는 미리 제출한 결과를 받기만 함)
+                segments, timings = extraction.result()
+                self.stages.add("open", timings["open"])
+                self.stages.add("collect", timings["collect"])
+        except Exception as e:
+            self.app.log_message(f"File Open Error ({self.filename}): {e}", "FATAL")
+            self.stop_profiler()
+            return False
+        self.log_file_path = os.path.join(os.path.dirname(self.input_path), f"log_{self.filename}.txt")
+        self.logger = FileLogger(self.log_file_path)
+        self.lifecycle = LifecycleManager()
+        # 엔진 통계는 전역 누적값이라, 동시에 열린 문서가 있으면 구간이 겹침
+        self.stats_start = snapshot_backend_stats()
+        self.journal = None
+        if config.get("journal_enabled"):
+            self.journal = TaskJournal(os.path.join(os.path.dirname(self.input_path), f"journal_{self.filename}.jsonl"))
+            resumed = self.journal.load()
+            if resumed: self.app.log_message(f"[{self.filename}] Resuming: {resumed} translations found in journal.", "SUCCESS")
+        if extraction is None:
+            self.parts = story_parts(self.doc)
+            source = iter_segments(self.parts)
+        else:
+            self.results = {}
+            source = ((None, text, is_tbl) for text, is_tbl in segments)
+        tasks = iter_tasks(source, DeadlineBudget(config.get("document_deadline_sec")), self.lifecycle)
+        self.jobs = iter_jobs(self.resume(tasks))
+        return True
+
+    def resume(self, tasks):
+        # 지난 실행에서 끝난 문단은 바로 반영하고, 나머지만 번역 작업으로 넘김
+        for task in tasks:
+            result = self.journal.lookup(task['text']) if self.journal else None
+            if not result:
+                yield task
+                continue
+            self.lifecycle.update_status(task['id'], "SUCCESS", result)
+            self.lifecycle.count("RESUMED")
+            if self.app.debug_mode: self.logger.add(task['id'], "RESUMED", "Journal", task['text'], result)
+            self.total += 1
+            self.finalize(task)
+
+    def next_job(self):
+        # 문단 추출 시간 (journal에서 바로 반영한 write-back 시간은 제외)
+        start, write_back_before = time.monotonic(), self.stages.seconds["write_back"]
+        job = next(self.jobs, None)
+        self.stages.add("collect", time.monotonic() - start - (self.stages.seconds["write_back"] - write_back_before))
+        if job is None:
+            self.exhausted = True
+            self.app.log_message(f"[{self.filename}] Analysis done: {self.total} items.")
+            self.app.update_progress(self.completed, self.total, self.label)
+        else: self.total += len(job)
+        return job
+
+    def failed(self, task):
+        if self.lifecycle.get(task['id'])["status"] != "FAILED": return False
+        if not self.recovering:
+            self.app.log_message(f"🚨 [{self.filename}] Some items failed. Recovery started...", "WARN")
+            self.recovering = True
+        return True
+
+    def finalize(self, task):
+        start = time.monotonic()
+        # 조각은 마지막 조각이 끝났을 때 원래 문단에 한 번만 반영
+        if 'parent' in task: task = task['parent'] if self.lifecycle.complete_chunk(task['id']) else None
+        info = task and self.lifecycle.get(task['id'])
         if info and info["status"] == "SUCCESS" and info["result"]:
-            res = info["result"]
-            para = task['obj']
-            is_table = task['is_table']
-            if is_already_translated_strict(para.text): continue
-            if is_table:
-                run = para.add_run(f"\n{res}")
-                run.italic = True
-                run.font.color.rgb = RGBColor(*APPEND_COLOR)
-                run.font.size = Pt(8)
-            else:
-                run = para.add_run(f" ({res})")
-                run.italic = True
-                run.font.color.rgb = RGBColor(*APPEND_COLOR)
-    
-    summary = lifecycle_manager.get_summary()
-    out_path = get_unique_filename(input_path, "Translated")
-    doc.save(out_path)
-    app.log_message(f"✅ [{filename}] Done!", "SUCCESS")
-    
-    app.insert_clickable_path(f"DOC: {os.path.abspath(out_path)}")
-    if app.debug_mode or summary['FAILED'] > 0:
-        app.insert_clickable_path(f"LOG: {os.path.abspath(saved_log_path)}")
-    
-    return out_path, log_file_path, summary
+            if self.results is None: write_back(task, info["result"])
+            else: self.results[task['index']] = info["result"]
+            if self.journal: self.journal.record(task['text'], info["result"])
+        self.stages.add("write_back", time.monotonic() - start)
+        self.completed += 1
+        self.app.update_progress(self.completed, self.total, self.label)
+
+    @property
+    def finished(self):
+        return self.exhausted and self.outstanding == 0
+
+    def call(self, fn, *args):
+        # 워커에서 실행되는 작업 (profiling 중이면 Profile로 감쌈)
+        return self.profiler.call(fn, *args) if self.profiler else fn(*args)
+
+    def stop_profiler(self):
+        if not self.profiler: return None
+        profiler, self.profiler = self.profiler, None
+        try:
+            report = profiler.stop()
+            self.app.log_message(f"[{self.filename}] Profile: {os.path.abspath(report)}", "SUCCESS")
+            return report
+        except Exception as e:
+            self.app.log_message(f"[{self.filename}] Profile export failed: {e}", "WARN")
+
+    def finish(self, workers):
+        try:
+            out_path, summary = self.begin_save()
+            try: save_document(self.doc, self.parts, self.input_path, out_path, config.get("save_passthrough"))
+            except Exception:
+                self.close_journal(False)
+                raise
+            return self.end_save(out_path, summary, workers)
+        finally: self.stop_profiler()
+
+    def submit_save(self, pool):
+        # process 모드: 결과(index -> 번역문)만 넘기고 write-back + 저장은 자식 프로세스에서 -> 완료 시 end_save
+        out_path, summary = self.begin_save()
+        future = pool.submit(write_document, self.input_path, out_path, self.results, config.get("save_passthrough"))
+        return future, out_path, summary
+
+    def begin_save(self):
+        filename, app = self.filename, self.app
+        stats = report_backend_stats(self.stats_start, filename, app, self.logger)
+        if self.profiler: self.logger.add_note(f"Profile: {self.profiler.base_path}.prof / .txt")
+        app.log_message(f"[{filename}] Saving file...")
+        self.save_start = time.monotonic()
+        self.saved_log_path = self.logger.save()
+
+        summary = self.lifecycle.get_summary()
+        summary.update(stats)
+        if translation_memory.enabled:
+            app.log_message(f"📚 [{filename}] TM hits: {summary.get('TM_HIT', 0)} / misses: {summary.get('TM_MISS', 0)}", "SUCCESS")
+        if summary.get("GLOSSARY_HIT") or summary.get("GLOSSARY_TERMS"):
+            app.log_message(f"📖 [{filename}] Glossary: {summary.get('GLOSSARY_HIT', 0)} paragraphs without a request, "
+                            f"{summary.get('GLOSSARY_TERMS', 0)} terms protected", "SUCCESS")
+        return get_unique_filename(self.input_path, "Translated"), summary
+
+    def close_journal(self, remove):
+        # 저장 실패 / 실패 항목이 남았으면 journal 유지 -> 재실행 시 남은 문단만 처리
+        if self.journal: self.journal.close(remove=remove)
+        self.doc = self.parts = self.results = None  # 저장 후 바로 해제 -> 다음 문서를 열 자리
+
+    def end_save(self, out_path, summary, workers, timings=None):
+        # timings: process 모드에서 자식 프로세스가 잰 write_back / save 시간
+        filename, app = self.filename, self.app
+        self.close_journal(summary['FAILED'] == 0 and os.path.exists(out_path))
+        if timings:
+            for stage, seconds in timings.items(): self.stages.add(stage, seconds)
+        else: self.stages.add("save", time.monotonic() - self.save_start)
+        elapsed = time.monotonic() - self.started
+        summary["ELAPSED_SEC"] = round(elapsed, 2)
+        summary["STAGES"] = self.stages.snapshot()
+        summary["QUEUE"] = {"depth_max": self.queue_max, "workers": workers,
+                            "worker_utilization": round(self.stages.seconds["translate"] / (workers * elapsed), 3) if elapsed else None}
+        export_file_metrics(self.input_path, summary)
+        app.log_message(f"✅ [{filename}] Done!", "SUCCESS")
+
+        app.insert_clickable_path(f"DOC: {os.path.abspath(out_path)}")
+        if app.debug_mode or summary['FAILED'] > 0:
+            app.insert_clickable_path(f"LOG: {os.path.abspath(self.saved_log_path)}")
+        return out_path, self.log_file_path, summary
+
+class RecoveryScheduler:
+    # 실패한 문단을 실패하는 즉시 recovery_workers 개 스레드에서 동시에 복구
+    # - 엔진은 backend.recovery_engines() 순서 (건강한 엔진 우선), 문단마다 최대 recovery_max_attempts 번
+    # - 실패한 엔진은 지수 백오프 + jitter 동안 건너뜀 (모든 엔진이 대기 중이면 가장 먼저 풀리는 엔진을 기다림)
+    # - 첫 시도는 항상, 이후 재시도는 RetryBudget 안에서만 -> 예산이 바닥나면 다시 채워질 때까지 대기
+    def __init__(self):
+        self.pool = ThreadPoolExecutor(max_workers=max(1, config.get("recovery_workers")))
+        self.budget = RetryBudget(config.get("retry_budget_ratio"), config.get("retry_budget_min"),
+                                  config.get("retry_budget_refill_per_sec"))
+        self.max_attempts = max(1, config.get("recovery_max_attempts"))
+        self.backoff = {}  # engine -> (연속 실패 수, 다음 시도 가능 시각)
+        self.lock = threading.Lock()
+
+    def submit(self, run, task):
+        return self.pool.submit(run.call, recover_task, task, run.logger, self)
+
+    def pick(self, engines):
+        # 대기 중이 아닌 첫 엔진, 없으면 가장 먼저 풀리는 엔진 -> (엔진, 남은 대기 시간)
+        now = time.monotonic()
+        with self.lock: ready_at = {e: self.backoff.get(e, (0, 0.0))[1] for e in engines}
+        engine = next((e for e in engines if ready_at[e] <= now), None) or min(engines, key=ready_at.get)
+        return engine, max(0.0, ready_at[engine] - now)
+
+    def record(self, engine, ok):
+        with self.lock:
+            if ok:
+                self.backoff.pop(engine, None)
+                return
+            failures, ready_at = self.backoff.get(engine, (0, 0.0))
+            now = time.monotonic()
+            # 이미 대기 중인 엔진 -> 같은 구간에 동시에 실패한 요청들은 한 번만 반영 (대기가 워커 수만큼 2배씩 늘지 않도록)
+            if ready_at > now: return
+            failures += 1
+            delay = min(RECOVERY_BACKOFF[1], RECOVERY_BACKOFF[0] * 2 ** (failures - 1))
+            # equal jitter: 절반은 고정, 절반은 무작위 -> 동시에 실패한 문단들이 같은 순간에 몰리지 않음
+            self.backoff[engine] = (failures, now + delay / 2 + random.uniform(0, delay / 2))
+
+    def translate(self, text, accept=None):
+        # accept(res): 결과 후처리 (None이면 실패로 보고 다음 엔진으로 재시도)
+        # circuit breaker 거절은 요청을 보내지 않았으므로 시도/예산에서 빼고 백오프만 (거절도 max_attempts 번까지)
+        backend = get_backend()
+        attempts = refused = 0
+        while attempts < self.max_attempts and refused < self.max_attempts:
+            engines = backend.recovery_engines()
+            if not engines: break
+            if attempts:
+                wait = self.budget.wait_time()
+                if wait is None: break
+                if wait: time.sleep(wait)
+            engine, delay = self.pick(engines)
+            if delay: time.sleep(delay)
+            try: res = backend.recover_with(engine, text)
+            except CircuitOpenError:
+                self.record(engine, False)
+                refused += 1
+                continue
+            except Exception: res = None
+            if res and accept: res = accept(res)
+            attempts += 1
+            self.budget.record(bool(res))
+            self.record(engine, bool(res))
+            if res: return res, engine
+        return None, None
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False)
+
+class BatchScheduler:
+    # 여러 파일을 하나의 작업 풀로 처리 (Global queue)
+    # - 앞 문서의 작업을 모두 제출하면 다음 문서를 열어 바로 이어서 제출 -> 문서 끝부분에서 풀이 비지 않음
+    # - 동시에 열어 두는 문서는 max_open_documents, 제출해 둔 작업은 pipeline_max_pending 으로 제한
+    # - python-docx 객체 수정(write-back/저장)은 모두 이 스케줄러를 돌리는 스레드에서만
+    # - document_mode = process: 열기/추출, write-back/저장은 프로세스 풀에서 (GIL 밖)
+    #   대기 중인 문서를 미리 추출해 두고 결과만 주고받음 -> N번 문서 번역 중에 N+1번 파싱/N-1번 저장
+    def __init__(self, app):
+        self.app = app
+        self.max_open = max(1, config.get("max_open_documents"))
+        self.max_pending = config.get("pipeline_max_pending")
+        self.pending = {}
+        self.open_docs = []
+        self.busy = 0.0
+
+    def submit(self, run, job):
+        if self.executor: future = self.executor.submit(run.call, run_job, job, self.app, run.logger)
+        else: future = async_dispatcher.submit(run_job_async, job, self.app, run.logger)
+        self.pending[future] = (run, "job", job)
+        self.recovery.budget.record_requests(len(job))
+        run.outstanding += 1
+        run.queue_max = max(run.queue_max, len(self.pending))
+        metrics.set_queue(len(self.pending))
+
+    def handle(self, future):
+        run, kind, payload = self.pending.pop(future)
+        if kind == "save": return self.saved(run, future, *payload)
+        run.outstanding -= 1
+        try: elapsed = future.result() or 0.0
+        except Exception as e:
+            elapsed = 0.0
+            self.crashed(run, kind, payload, e)
+        if kind == "job":
+            self.busy += elapsed
+            run.stages.add("translate", elapsed)
+            for task in payload:
+                if run.failed(task):
+                    self.pending[self.recovery.submit(run, task)] = (run, "recovery", task)
+                    run.outstanding += 1
+                else: run.finalize(task)
+        else:
+            run.stages.add("recovery", elapsed)
+            run.finalize(payload)
+        metrics.set_queue(len(self.pending), self.busy / (self.workers * (time.monotonic() - self.started)))
+
+    def crashed(self, run, kind, payload, e):
+        # 작업 함수가 예외로 끝남: 끝나지 않은 문단은 FAILED -> 복구 단계로 (복구 중 예외는 FINAL_FAIL)
+        self.app.log_message(f"[{run.filename}] {kind} crashed: {type(e).__name__}: {e}", "WARN")
+        for task in payload if kind == "job" else [payload]:
+            run.logger.add(task['id'], "ERROR", "CRASH", task['text'], str(e))
+            if kind != "job": run.lifecycle.count("FINAL_FAIL")
+            elif run.lifecycle.get(task['id'])["status"] not in ("SUCCESS", "SKIPPED"):
+                run.lifecycle.update_status(task['id'], "FAILED")
+
+    def saved(self, run, future, out_path, summary):
+        try: self.record(run, run.end_save(out_path, summary, self.workers, future.result()))
+        except Exception as e:
+            run.close_journal(False)
+            self.app.log_message(f"Save Error ({run.filename}): {e}", "FATAL")
+            self.record(run, None)
+
+    def record(self, run, result):
+        self.results[run.num] = result
+        summary = result and result[2]
+        record_file_metrics(summary, summary and summary["STAGES"])
+
+    def finish(self, run):
+        if self.process_pool is None:
+            try: result = run.finish(self.workers)
+            except Exception as e:
+                self.app.log_message(f"Save Error ({run.filename}): {e}", "FATAL")
+                result = None
+            return self.record(run, result)
+        try: future, out_path, summary = run.submit_save(self.process_pool)
+        except Exception as e:
+            run.close_journal(False)
+            self.app.log_message(f"Save Error ({run.filename}): {e}", "FATAL")
+            return self.record(run, None)
+        self.pending[future] = (run, "save", (out_path, summary))
+
+    def prefetch(self, queue):
+        # 다음에 열 문서들을 미리 추출 (풀 크기만큼)
+        for num, path in itertools.islice(queue, self.process_workers):
+            if num not in self.extractions:
+                self.extractions[num] = self.process_pool.submit(extract_document, path)
+
+    def drain(self, block):
+        if block:
+            done, _ = wait(self.pending, return_when=FIRST_COMPLETED)
+        else:
+            done = [f for f in self.pending if f.done()]
+        for future in done: self.handle(future)
+
+    def run(self, paths):
+        queue = deque(enumerate(paths, 1))
+        self.results = {}
+        self.executor = None if use_async_mode(self.app) else ThreadPoolExecutor(max_workers=MAX_WORKERS)
+        self.workers = MAX_WORKERS if self.executor else async_dispatcher.concurrency
+        self.recovery = RecoveryScheduler()
+        self.started = time.monotonic()
+        start_metrics_server(config.get("metrics_port"))
+        self.profiling = profiling_enabled()
+        if self.profiling:
+            # 파일별 프로파일이 섞이지 않도록 한 번에 한 문서씩
+            self.max_open = 1
+            self.app.log_message("Profiling on: documents are processed one at a time.", "WARN")
+        # 프로파일은 이 프로세스 안에서만 잡히므로 profiling 중에는 thread 모드
+        self.process_pool, self.extractions = None, {}
+        if config.get("document_mode") == "process" and not self.profiling:
+            self.process_workers = max(1, min(config.get("document_processes") or os.cpu_count() or 1, len(paths)))
+            self.process_pool = ProcessPoolExecutor(max_workers=self.process_workers)
+        try:
+            while queue or self.open_docs or self.pending:
+                get_backend().maybe_refresh(self.app)
+                if self.process_pool: self.prefetch(queue)
+                feeder = next((r for r in self.open_docs if not r.exhausted), None)
+                if feeder is None and queue and len(self.open_docs) < self.max_open:
+                    num, path = queue.popleft()
+                    run = DocumentRun(path, num, len(paths), self.app)
+                    if run.open(self.profiling, self.extractions.pop(num, None)): self.open_docs.append(run)
+                    else: self.record(run, None)
+                    continue
+                if feeder is not None and len(self.pending) < self.max_pending:
+                    job = feeder.next_job()
+                    if job is not None: self.submit(feeder, job)
+                    self.drain(block=False)
+                elif self.pending: self.drain(block=True)
+                for run in [r for r in self.open_docs if r.finished]:
+                    self.open_docs.remove(run)
+                    self.finish(run)
+        finally:
+            if self.executor: self.executor.shutdown(wait=False)
+            self.recovery.shutdown()
+            if self.process_pool: self.process_pool.shutdown(wait=False, cancel_futures=True)
+        budget = self.recovery.budget.snapshot()
+        if budget["waits"]:
+            self.app.log_message(f"Retry budget reached: recovery waited {budget['waits']} times "
+                                 f"({budget['failures']} of {budget['retries']} retries failed, {budget['requests']} segments).", "WARN")
+        return [self.results.get(num) for num in range(1, len(paths) + 1)]
+
+def run_process_thread(input_path, app):
+    return BatchScheduler(app).run([input_path])[0]
+
+# ===== [Headless CLI] =====
+# 서버/배치 작업용: App 대신 ConsoleReporter로 같은 파이프라인 실행, tkinter는 import하지 않음
+#   python DocuBridge.py "docs/**/*.docx" --json summary.json
+EXIT_OK = 0
+EXIT_ITEMS_FAILED = 1    # 일부 문단 번역 실패 (복구 후에도 FAILED)
+EXIT_FILES_FAILED = 3    # 열기/저장에 실패한 파일 있음 (2는 argparse 사용법 오류)
+EXIT_NO_INPUT = 4
+
+class ConsoleReporter:
+    # App과 같은 진행 보고 인터페이스 - 로그는 stderr로 (stdout은 JSON summary 용)
+    def __init__(self, debug_mode=False, quiet=False, assume_yes=False):
+        self.debug_mode = debug_mode
+        self.quiet = quiet
+        self.assume_yes = assume_yes
+        self.last_step = {}
+        self.lock = threading.Lock()
+
+    def write(self, text):
+        with self.lock: print(text, file=sys.stderr, flush=True)
+
+    def log_message(self, msg, tag=None):
+        if self.quiet and tag not in ["WARN", "FATAL"]: return
+        if not self.debug_mode and tag not in ["SUCCESS", "WARN", "FATAL"]: return
+        self.write(f"[{tag}] {msg}" if tag else msg)
+
+    def update_progress(self, curr, total, file_label=""):
+        # 파일별 10% 단위로만 출력
+        if self.quiet or total <= 0: return
+        step = int(curr * 10 / total)
+        if step <= self.last_step.get(file_label, -1): return
+        self.last_step[file_label] = step
+        self.write(f"{file_label} - {step * 10}% ({curr}/{total})")
+
+    def update_status_text(self, text):
+        if self.debug_mode: self.write(text)
+
+    def insert_clickable_path(self, text):
+        if not self.quiet: self.write(text)
+
+    def start_checking_animation(self): pass
+    def stop_checking_animation(self): pass
+
+    def confirm(self, title, message):
+        # 대화형 확인 불가 -> --yes 일 때만 수락
+        return self.assume_yes
+
+    def show_error(self, title, message):
+        self.write(f"[FATAL] {title}: {message}")
+
+def expand_inputs(patterns):
+    # 파일 / 폴더 / glob 패턴 -> .docx 경로 목록 (순서 유지, 중복/Word 임시파일 제외)
+    paths = []
+    for pattern in patterns:
+        if any(c in pattern for c in "*?["): matches = sorted(glob.glob(pattern, recursive=True))
+        elif os.path.isdir(pattern): matches = sorted(glob.glob(os.path.join(pattern, "*.docx")))
+        else: matches = [pattern]
+        for path in matches:
+            if os.path.basename(path).startswith("~$") or not path.lower().endswith(".docx"): continue
+            if path not in paths: paths.append(path)
+    return paths
+
+def build_report(paths, results, elapsed, health_sec):
+    files, totals = [], {"files": len(paths), "files_failed": 0}
+    for path, res in zip(paths, results):
+        if not res:
+            totals["files_failed"] += 1
+            files.append({"input": path, "error": "open/save failed"})
+            continue
+        out_path, log_path, summary = res
+        files.append({"input": path, "output": out_path, "log": log_path, "summary": summary})
+        for key, value in summary.items():
+            if isinstance(value, int): totals[key] = totals.get(key, 0) + value
+    if totals["files_failed"]: exit_code = EXIT_FILES_FAILED
+    elif totals.get("FAILED", 0): exit_code = EXIT_ITEMS_FAILED
+    else: exit_code = EXIT_OK
+    return {"version": CURRENT_VERSION, "exit_code": exit_code, "elapsed_sec": round(elapsed, 2),
+            "health_check_sec": round(health_sec, 2), "totals": totals, "files": files}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog=APP_NAME, description="Translate Korean .docx files without the GUI.")
+    parser.add_argument("inputs", nargs="*", help=".docx files, folders or glob patterns")
+    parser.add_argument("--backend", choices=["online", "local"], help="engine priority for this run (default: backend_priority in config)")
+    parser.add_argument("--execution-mode", choices=["thread", "async"], help="override execution_mode for this run")
+    parser.add_argument("--document-mode", choices=["thread", "process"], help="override document_mode for this run")
+    parser.add_argument("--json", default="-", metavar="PATH", help="where to write the JSON summary (default: stdout)")
+    parser.add_argument("--debug", action="store_true", help="verbose log (add --profile for profiling reports)")
+    parser.add_argument("--quiet", action="store_true", help="only warnings and errors on stderr")
+    parser.add_argument("--yes", action="store_true", help="download a missing local AI model without asking")
+    parser.add_argument("--metrics-json", action="store_true", help="write metrics_<file>.json next to each log")
+    parser.add_argument("--prometheus", metavar="PATH", help="write Prometheus text-format metrics to PATH after each file")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT", help="serve Prometheus metrics on 127.0.0.1:PORT/metrics")
+    parser.add_argument("--profile", action="store_true", help="write profile_<file>.prof / .txt next to each log")
+    parser.add_argument("--invalidate-tm", nargs="?", const="", metavar="ENGINE",
+                        help="drop cached translations before running (all, or one engine e.g. google, ollama:qwen2.5:1.5b)")
+    args = parser.parse_args(argv)
+    if not args.inputs and args.invalidate_tm is None: parser.error("no input files")
+
+    reporter = ConsoleReporter(args.debug, args.quiet, args.yes)
+    # 이번 실행에만 적용 (config.json에는 저장하지 않음)
+    if args.execution_mode: config.override("execution_mode", args.execution_mode)
+    if args.document_mode: config.override("document_mode", args.document_mode)
+    if args.metrics_json: config.override("metrics_json", True)
+    if args.profile: config.override("profile_mode", True)
+    if args.prometheus: config.override("metrics_prom_path", args.prometheus)
+    if args.metrics_port: config.override("metrics_port", args.metrics_port)
+    if args.backend: get_backend().priority = args.backend
+    if args.invalidate_tm is not None:
+        removed = translation_memory.invalidate(args.invalidate_tm or None)
+        reporter.log_message(f"TM: {removed} entries removed.", "SUCCESS")
+        if not args.inputs: return EXIT_OK
+
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        reporter.log_message("No .docx files matched.", "FATAL")
+        return EXIT_NO_INPUT
+
+    started = time.monotonic()
+    check_engine_health(reporter)
+    health_sec = time.monotonic() - started
+    results = BatchScheduler(reporter).run(paths)
+    report = build_report(paths, results, time.monotonic() - started, health_sec)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.json == "-": print(text)
+    else:
+        with open(args.json, 'w', encoding='utf-8') as f: f.write(text)
+    return report["exit_code"]
 
 # ===== [GUI App] =====
+class UiChannel:
+    # 작업 스레드 -> Tk 스레드 전달 큐: 작업마다 root.after를 부르지 않고 App.flush_ui가 주기적으로 한 번에 반영
+    # - 진행률/상태 문구는 마지막 값만 유지, 로그는 max_lines 만큼만 보관 (넘치면 건너뛴 줄 수만 표시)
+    def __init__(self, max_lines):
+        self.lock = threading.Lock()
+        self.lines = deque(maxlen=max_lines)
+        self.dropped = 0
+        self.progress = None
+        self.status = None
+
+    def log(self, *chunks):
+        # chunks: (text, tag) - 한 항목의 여러 조각은 같이 보관/삭제
+        with self.lock:
+            if len(self.lines) == self.lines.maxlen: self.dropped += 1
+            self.lines.append(chunks)
+
+    def set_progress(self, pct, text):
+        with self.lock: self.progress, self.status = pct, text
+
+    def set_status(self, text):
+        with self.lock: self.status = text
+
+    def take(self):
+        with self.lock:
+            lines, dropped, progress, status = list(self.lines), self.dropped, self.progress, self.status
+            self.lines.clear()
+            self.dropped, self.progress, self.status = 0, None, None
+        return lines, dropped, progress, status
+
 class App:
     def __init__(self, root):
         self.root = root
@@ -554,6 +2875,7 @@ class App:
         saved_debug = config.get("debug_mode", False)
         self.debug_var = tk.BooleanVar(value=saved_debug) 
         self.debug_mode = saved_debug 
+        self.profile_var = tk.BooleanVar(value=False)  # 저장하지 않음 - 시작할 때마다 꺼진 상태
 
         saved_theme = config.get("theme", "light")
         is_dark_init = (saved_theme == "dark")
@@ -561,6 +2883,8 @@ class App:
 
         self.file_paths = []
         self.is_checking_engines = False
+        self.max_log_lines = max(100, config.get("log_max_lines"))
+        self.ui = UiChannel(self.max_log_lines)
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
         # Header
@@ -590,6 +2914,8 @@ class App:
         ctl_frame.pack(fill='x', pady=5)
         self.chk_debug = ttk.Checkbutton(ctl_frame, text="Debug Mode", variable=self.debug_var, command=self.toggle_debug)
         self.chk_debug.pack(side='left', padx=5)
+        self.chk_profile = ttk.Checkbutton(ctl_frame, text="Profile", variable=self.profile_var, command=self.toggle_profile)
+        self.chk_profile.pack(side='left', padx=5)
         self.chk_dark = ttk.Checkbutton(ctl_frame, text="Dark Mode", variable=self.dark_mode_var, command=self.toggle_theme)
         self.chk_dark.pack(side='left', padx=5)
 
@@ -619,6 +2945,7 @@ class App:
         self.log_area.tag_bind("HYPERLINK", "<Button-1>", self.on_link_click)
         self.log_area.tag_bind("HYPERLINK", "<Enter>", lambda e: self.log_area.config(cursor="hand2"))
         self.log_area.tag_bind("HYPERLINK", "<Leave>", lambda e: self.log_area.config(cursor="arrow"))
+        self.log_area.tag_config("gray", foreground="gray", font=("Segoe UI", 8))
         
         if is_dark_init:
             self.toggle_theme()
@@ -627,14 +2954,28 @@ class App:
             self.toggle_debug()
 
         threading.Thread(target=self.update_manager.check_for_updates, daemon=True).start()
+        threading.Thread(target=preload_modules, daemon=True).start()
+        self.root.after(config.get("ui_refresh_ms"), self.flush_ui)
+
+    def flush_ui(self):
+        # Tk 스레드에서 주기적으로: 쌓인 로그는 insert 한 번, 진행률/상태는 마지막 값만 반영
+        lines, dropped, progress, status = self.ui.take()
+        if progress is not None: self.progress.configure(value=progress)
+        if status is not None: self.lbl_status_detail.config(text=status)
+        if lines or dropped:
+            args = [f"... {dropped} log lines skipped\n", "gray"] if dropped else []
+            for chunks in lines:
+                for text, tag in chunks: args += [text, tag or ""]
+            self.log_area.config(state='normal')
+            self.log_area.insert(tk.END, *args)
+            excess = int(self.log_area.index("end-1c").split(".")[0]) - 1 - self.max_log_lines  # 마지막 줄은 빈 줄
+            if excess > 0: self.log_area.delete("1.0", f"{excess + 1}.0")
+            self.log_area.see(tk.END)
+            self.log_area.config(state='disabled')
+        self.root.after(config.get("ui_refresh_ms"), self.flush_ui)
 
     def insert_clickable_path(self, text):
-        self.log_area.config(state='normal')
-        self.log_area.insert(tk.END, text + "\n", "HYPERLINK")
-        self.log_area.insert(tk.END, "(Click to open)\n", "gray")
-        self.log_area.tag_config("gray", foreground="gray", font=("Segoe UI", 8))
-        self.log_area.see(tk.END)
-        self.log_area.config(state='disabled')
+        self.ui.log((text + "\n", "HYPERLINK"), ("(Click to open)\n", "gray"))
 
     def on_link_click(self, event):
         try:
@@ -646,25 +2987,27 @@ class App:
 
     def start_checking_animation(self):
         self.is_checking_engines = True
-        threading.Thread(target=self._animate_checking, daemon=True).start()
-
-    def _animate_checking(self):
-        dots = ["", ".", "..", "..."]
-        idx = 0
-        while self.is_checking_engines:
-            msg = f"Checking translation engines{dots[idx % 4]}"
-            self.update_status_text(msg)
-            idx += 1
-            time.sleep(0.5)
+        self.root.after(0, self._animate_checking, 0)
+
+    def _animate_checking(self, idx):
+        # Tk 스레드에서 0.5초마다 갱신 - 멈춘 뒤 예약된 호출은 아무것도 하지 않음
+        if not self.is_checking_engines: return
+        self.lbl_status_detail.config(text=f"Checking translation engines{['', '.', '..', '...'][idx % 4]}")
+        self.root.after(500, self._animate_checking, idx + 1)
     
     def stop_checking_animation(self):
+        # 같은 Tk 스레드 큐를 거치므로 애니메이션이 완료 문구를 덮어쓰지 않음 (sleep 불필요)
         self.is_checking_engines = False
-        time.sleep(0.6)
         self.update_status_text("Done! Engines ready.")
-        time.sleep(1)
 
     def update_status_text(self, text):
-        self.root.after(0, lambda: self.lbl_status_detail.config(text=text))
+        self.ui.set_status(text)
+
+    def confirm(self, title, message):
+        return messagebox.askyesno(title, message)
+
+    def show_error(self, title, message):
+        messagebox.showerror(title, message)
 
     def toggle_theme(self):
         is_dark = self.dark_mode_var.get()
@@ -728,14 +3071,18 @@ class App:
         if self.debug_mode: self.log_message("🕵️ Debug Mode ON")
         else: self.log_message("🚀 High-Speed Mode")
 
+    def toggle_profile(self):
+        # 프로파일은 이번 세션에만 (config에 저장하지 않음 -> 다음 실행은 항상 꺼진 상태로 시작)
+        if self.profile_var.get():
+            config.override("profile_mode", True)
+            self.log_message("Profiling ON: reports are written next to the logs, one document at a time.", "WARN")
+        else:
+            config.overrides.pop("profile_mode", None)
+            self.log_message("Profiling OFF")
+
     def log_message(self, msg, tag=None):
         if not self.debug_mode and tag not in ["SUCCESS", "WARN", "FATAL"]: return
-        def _log():
-            self.log_area.config(state='normal')
-            self.log_area.insert(tk.END, f"{msg}\n", tag)
-            self.log_area.see(tk.END)
-            self.log_area.config(state='disabled')
-        self.root.after(0, _log)
+        self.ui.log((f"{msg}\n", tag))
 
     def select_files(self):
         files = filedialog.askopenfilenames(filetypes=[("Word files", "*.docx")])
@@ -750,6 +3097,7 @@ class App:
         self.btn_select.config(state='disabled')
         self.btn_run.config(state='disabled')
         self.debug_mode = self.debug_var.get()
+        self.ui.take()  # 지난 실행에서 아직 반영되지 않은 로그 버림
         self.log_area.config(state='normal')
         self.log_area.delete(1.0, tk.END) 
         self.log_area.config(state='disabled')
@@ -759,31 +3107,20 @@ class App:
     def run_batch_logic(self):
         check_engine_health(self)
         total_files = len(self.file_paths)
-        success_files = 0
-        for i, path in enumerate(self.file_paths):
-            current_num = i + 1
-            filename = os.path.basename(path)
-            self.current_file_info = f"[{current_num}/{total_files}] {filename}"
-            self.update_progress(0, 100, filename)
-            self.log_message(f"=== Processing {self.current_file_info} ===", "SUCCESS")
-            res = run_process_thread(path, self)
-            if res: success_files += 1
-            time.sleep(1)
+        results = BatchScheduler(self).run(list(self.file_paths))
+        success_files = sum(1 for res in results if res)
         messagebox.showinfo("Done", f"All tasks finished!\nSuccess: {success_files}/{total_files}")
         self.reset_ui()
             
-    def update_progress(self, curr, total, filename=""):
-        file_idx_info = getattr(self, 'current_file_info', "")
+    def update_progress(self, curr, total, file_label=""):
+        # file_label: "[n/N] 파일명" (여러 문서가 동시에 진행되면 마지막으로 갱신한 문서가 표시됨)
         if total > 0:
             pct = (curr / total) * 100
-            msg = f"{file_idx_info} - {int(pct)}% ({curr}/{total})"
-            self.root.after(0, lambda: self.progress.configure(value=pct))
-            self.root.after(0, lambda: self.lbl_status_detail.config(text=msg))
+            self.ui.set_progress(pct, f"{file_label} - {int(pct)}% ({curr}/{total})")
 
     def reset_ui(self):
         self.file_paths = [] 
-        self.root.after(0, lambda: self.lbl_status_detail.config(text="Please select Word files (.docx)"))
-        self.root.after(0, lambda: self.progress.configure(value=0))
+        self.ui.set_progress(0, "Please select Word files (.docx)")
         self.root.after(0, lambda: self.btn_select.config(state='normal'))
         self.root.after(0, lambda: self.btn_run.config(state='disabled')) 
 
@@ -795,6 +3132,10 @@ class App:
         self.root.destroy() 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # PyInstaller exe에서 process 모드 자식 프로세스
+    # 인자가 있으면 headless CLI, 없으면 GUI
+    if len(sys.argv) > 1: sys.exit(main())
+    load_tkinter()
     root = tk.Tk()
     app = App(root)
     root.mainloop()
\ No newline at end of file
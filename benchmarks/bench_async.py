@@ -0,0 +1,87 @@
+# Thread path vs async path throughput against a local mock Ollama server.
+#
+#   python benchmarks/bench_async.py --segments 400 --latency 0.05 --concurrency 64
+#
+# The mock server answers every request after a fixed delay, like an Ollama server
+# started with a high OLLAMA_NUM_PARALLEL, so the numbers show dispatch overhead
+# and in-flight limits rather than model speed.
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("translators_default_region", "EN")  # translators probes the network on import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import DocuBridge as DB  # noqa: E402
+from mock_ollama import MockOllamaServer  # noqa: E402
+
+
+class NullApp:
+    debug_mode = False
+    def log_message(self, msg, tag=None): pass
+
+
+def make_backend(server, parallel):
+    backend = DB.OllamaBackend()
+    backend.base_url = server.base_url
+    backend.api_url = f"{server.base_url}/api/chat"
+    backend.is_available = True
+    # 서버가 OLLAMA_NUM_PARALLEL=parallel 로 떠 있다고 가정
+    backend.set_parallel(parallel)
+    return backend
+
+
+def bench_thread(server, texts, workers):
+    backend = make_backend(server, workers)
+    app = NullApp()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lambda t: backend.translate(t, 0, app, None, 0), texts))
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(1 for r, _ in results if r)
+
+
+def bench_async(server, texts, concurrency):
+    backend = make_backend(server, concurrency)
+    app = NullApp()
+    dispatcher = DB.AsyncDispatcher(concurrency)
+    dispatcher.start()
+    try:
+        start = time.perf_counter()
+        futures = [dispatcher.submit(backend.translate_async, t, 0, app, None, 0) for t in texts]
+        results = [f.result() for f in futures]
+        elapsed = time.perf_counter() - start
+    finally:
+        dispatcher.close()
+    return elapsed, sum(1 for r, _ in results if r)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--segments", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    texts = [f"계약 조항 {i}번 내용입니다." for i in range(args.segments)]
+    server = MockOllamaServer(latency=args.latency).start()
+    try:
+        report = {"segments": args.segments, "latency": args.latency}
+        for name, fn, width in (("thread", bench_thread, DB.MAX_WORKERS), ("async", bench_async, args.concurrency)):
+            elapsed, ok = fn(server, texts, width)
+            report[name] = {"in_flight": width, "seconds": round(elapsed, 3),
+                            "segments_per_sec": round(len(texts) / elapsed, 1), "succeeded": ok}
+            print(f"{name:>6}: {width:3d} in flight  {elapsed:7.2f}s  {len(texts) / elapsed:8.1f} seg/s  ({ok}/{len(texts)} ok)")
+    finally:
+        server.stop()
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# Paragraph extraction: python-docx traversal (doc.paragraphs, table.rows -> row.cells -> cell.paragraphs)
+# vs. the XPath extractor in DocuBridge (story_parts + iter_segments) on documents with large tables.
+#
+#   python benchmarks/bench_extract.py --cells 12000 --runs 3 --output extract.json
+#
+# Both sides start from an already opened document; "segments" counts non-empty paragraphs
+# (the old traversal de-duplicated merged cells with a seen set, as the pipeline did).
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from synthetic_docx import make_document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import DocuBridge as DB  # noqa: E402
+
+
+def legacy_extract(doc):
+    def paragraphs():
+        for para in doc.paragraphs: yield para, False
+        for table in doc.tables:
+            for row in table.rows:
+                for cell in row.cells:
+                    for para in cell.paragraphs: yield para, True
+
+    seen, segments = set(), []
+    for para, is_tbl in paragraphs():
+        if para._element in seen: continue
+        seen.add(para._element)
+        text = para.text
+        if text.strip(): segments.append((text, is_tbl))
+    return segments
+
+
+def xpath_extract(doc):
+    tasks = DB.iter_tasks(DB.iter_segments(DB.story_parts(doc)), None, DB.LifecycleManager())
+    return [(task['text'], task['is_table']) for task in tasks]
+
+
+def measure(name, fn, path, runs):
+    samples, segments = [], []
+    for _ in range(runs):
+        doc = DB.docx.Document(path)
+        start = time.perf_counter()
+        segments = fn(doc)
+        samples.append(time.perf_counter() - start)
+    result = {"median_sec": round(statistics.median(samples), 4), "min_sec": round(min(samples), 4),
+              "segments": len(segments), "table_segments": sum(1 for _, is_tbl in segments if is_tbl)}
+    print(f"{name:>7}: {result['median_sec']:8.4f}s median  ({result['min_sec']:.4f}s min)  "
+          f"{result['segments']} segments, {result['table_segments']} in tables")
+    return result, segments
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cells", type=int, default=12000, help="total table cells (split over --tables)")
+    parser.add_argument("--tables", type=int, default=4)
+    parser.add_argument("--cols", type=int, default=4)
+    parser.add_argument("--paragraphs", type=int, default=500)
+    parser.add_argument("--nested-every", type=int, default=50, help="a 2x2 table inside a cell every N rows (0: none)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    rows = max(2, args.cells // (args.tables * args.cols))
+    with tempfile.TemporaryDirectory() as work:
+        path = make_document(os.path.join(work, "cells.docx"), args.paragraphs, args.tables, rows, args.cols,
+                             long_paragraphs=0, header=True, nested_every=args.nested_every)
+        print(f"document: {args.tables} tables x {rows} rows x {args.cols} cols = {args.tables * rows * args.cols} cells")
+        legacy, legacy_segments = measure("legacy", legacy_extract, path, args.runs)
+        xpath, xpath_segments = measure("xpath", xpath_extract, path, args.runs)
+
+    # 새 추출기에서만 나오는 문단 (머리글/바닥글, 중첩 표)
+    legacy_texts = {text for text, _ in legacy_segments}
+    extra = [text for text, _ in xpath_segments if text not in legacy_texts]
+    speedup = round(legacy["median_sec"] / xpath["median_sec"], 1) if xpath["median_sec"] else None
+    print(f"speedup: {speedup}x, {len(extra)} segments only found by the xpath extractor (headers/footers, nested tables)")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "rows": rows, "legacy": legacy, "xpath": xpath,
+                       "speedup": speedup, "xpath_only_segments": len(extra)}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
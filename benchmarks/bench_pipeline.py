@@ -0,0 +1,169 @@
+# End-to-end throughput of run_process_thread on a synthetic document, with local stand-in engines.
+#
+#   python benchmarks/bench_pipeline.py --paragraphs 400 --latency 0.05 --failure-rate 0.02 --output pipeline.json
+#   python benchmarks/bench_pipeline.py --baseline pipeline.json      # compare with an earlier run
+#   python benchmarks/bench_pipeline.py --scenarios online --latency-per-char 0.002 --chunk-max-chars 0   # long paragraphs unsplit
+#
+# Scenarios (each in a fresh interpreter so peak RSS is per scenario):
+#   online  fake `translators` engine (benchmarks/fake_engine.py) with latency / jitter / failure rate
+#   local   mock Ollama server (benchmarks/mock_ollama.py), backend_priority = local
+# TM and journal are off so every run does the same work.
+#
+# Per-segment latency is the run time of the job a segment was dispatched in (a batch counts for each
+# of its segments), so queueing in front of the worker pool is not included.
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from mock_ollama import MockOllamaServer
+from synthetic_docx import make_document
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCENARIOS = ("online", "local")
+
+
+def percentile(values, pct):
+    if not values: return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+def peak_rss_mb():
+    try: import resource
+    except ImportError: return None  # Windows
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024) if platform.system() == "Darwin" else rss / 1024, 1)
+
+
+def run_child(args):
+    # 작업 폴더의 config.json (TM/journal off, backend 우선순위)을 읽도록 import 전에 이동
+    os.chdir(args.work)
+    import DocuBridge as DB
+    from fake_engine import FakeTranslators
+
+    fake = FakeTranslators(args.latency, args.jitter, args.failure_rate, per_char=args.latency_per_char)
+    DB.ts = fake
+    latencies = []
+    lock = threading.Lock()
+
+    def record(start, job):
+        elapsed = time.perf_counter() - start
+        with lock: latencies.extend([elapsed] * len(job))
+
+    run_job, run_job_async = DB.run_job, DB.run_job_async
+
+    def timed_run_job(job, app, logger):
+        start = time.perf_counter()
+        try: return run_job(job, app, logger)
+        finally: record(start, job)
+
+    async def timed_run_job_async(job, app, logger, session):
+        start = time.perf_counter()
+        try: return await run_job_async(job, app, logger, session)
+        finally: record(start, job)
+
+    DB.run_job, DB.run_job_async = timed_run_job, timed_run_job_async
+    app = DB.ConsoleReporter(quiet=True)
+    DB.check_engine_health(app)
+    start = time.perf_counter()
+    res = DB.run_process_thread(args.doc, app)
+    elapsed = time.perf_counter() - start
+    if not res: raise SystemExit("run_process_thread failed")
+    summary = res[2]
+    segments = sum(summary.get(k, 0) for k in ("SUCCESS", "SKIPPED", "FAILED", "READY", "IN_PROGRESS"))
+    result = {
+        "segments": segments,
+        "seconds": round(elapsed, 3),
+        "paragraphs_per_sec": round(segments / elapsed, 1),
+        "latency_ms": {f"p{p}": round(percentile(latencies, p) * 1000, 1) if latencies else None for p in (50, 95, 99)},
+        "dispatched_segments": len(latencies),
+        "succeeded": summary.get("SUCCESS", 0),
+        "recovered": summary.get("RECOVERED", 0),
+        "final_failed": summary.get("FINAL_FAIL", 0),
+        "engine_calls": dict(fake.calls),
+        "engine_failures": fake.failures,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    print(json.dumps(result))
+
+
+def run_scenario(name, args, doc_path):
+    server = MockOllamaServer(latency=args.ollama_latency).start() if name == "local" else None
+    try:
+        with tempfile.TemporaryDirectory() as work:
+            settings = {"tm_enabled": False, "journal_enabled": False, "execution_mode": args.execution_mode,
+                        "backend_priority": "local" if name == "local" else "online", "chunk_max_chars": args.chunk_max_chars}
+            if server: settings["ollama_url"] = server.base_url
+            with open(os.path.join(work, "config.json"), "w", encoding="utf-8") as f: json.dump(settings, f)
+            cmd = [sys.executable, os.path.abspath(__file__), "--child", "--work", work, "--doc", doc_path,
+                   "--latency", str(args.latency), "--jitter", str(args.jitter), "--failure-rate", str(args.failure_rate),
+                   "--latency-per-char", str(args.latency_per_char)]
+            env = {**os.environ, "PYTHONPATH": os.pathsep.join([REPO, BENCH_DIR]), "translators_default_region": "EN"}
+            proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(proc.stderr, file=sys.stderr)
+                raise SystemExit(f"scenario {name} failed")
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            if server: result["ollama_requests"] = server.requests
+            return result
+    finally:
+        if server: server.stop()
+
+
+def print_row(name, r, base=None):
+    line = (f"{name:>7}: {r['segments']:5d} segs  {r['seconds']:7.2f}s  {r['paragraphs_per_sec']:7.1f} para/s  "
+            f"p50 {r['latency_ms']['p50']}ms  p95 {r['latency_ms']['p95']}ms  p99 {r['latency_ms']['p99']}ms  "
+            f"recovered {r['recovered']}  final fail {r['final_failed']}  rss {r['peak_rss_mb']}MB")
+    if base:
+        change = (r["paragraphs_per_sec"] - base["paragraphs_per_sec"]) / base["paragraphs_per_sec"] * 100
+        line += f"  ({change:+.1f}% para/s vs baseline)"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma separated: online,local")
+    parser.add_argument("--paragraphs", type=int, default=400)
+    parser.add_argument("--tables", type=int, default=2)
+    parser.add_argument("--rows", type=int, default=30)
+    parser.add_argument("--long-paragraphs", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake translators latency (s)")
+    parser.add_argument("--latency-per-char", type=float, default=0.0, help="extra fake latency per input character (s)")
+    parser.add_argument("--jitter", type=float, default=0.5)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--ollama-latency", type=float, default=0.05)
+    parser.add_argument("--execution-mode", choices=["thread", "async"], default="thread")
+    parser.add_argument("--chunk-max-chars", type=int, default=500, help="split longer paragraphs (0: off)")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="earlier --output file to compare against")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--work", help=argparse.SUPPRESS)
+    parser.add_argument("--doc", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child: return run_child(args)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f: baseline = json.load(f).get("scenarios", {})
+    report = {"params": {k: v for k, v in vars(args).items() if k not in ("child", "work", "doc", "output", "baseline")},
+              "python": platform.python_version(), "scenarios": {}}
+    with tempfile.TemporaryDirectory() as docs:
+        doc_path = make_document(os.path.join(docs, "synthetic.docx"), args.paragraphs, args.tables, args.rows,
+                                 long_paragraphs=args.long_paragraphs)
+        for name in args.scenarios.split(","):
+            result = run_scenario(name, args, doc_path)
+            report["scenarios"][name] = result
+            print_row(name, result, baseline.get(name))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f: json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# Saving a translated document: python-docx doc.save (re-serializes and re-compresses every part)
+# vs. DocuBridge.save_document with save_passthrough (only story parts rewritten, media copied as stored).
+#
+#   python benchmarks/bench_save.py --images 20 --image-kb 2048 --runs 3 --output save.json
+#
+# The document is synthetic_docx text plus noise PNGs (incompressible, like photos / screenshots).
+# Every paragraph gets a translated run first, so both sides write the same content.
+import argparse
+import json
+import os
+import random
+import statistics
+import struct
+import sys
+import tempfile
+import time
+import zlib
+
+from synthetic_docx import make_document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import DocuBridge as DB  # noqa: E402
+
+
+def noise_png(path, kb, seed):
+    # 무작위 그레이스케일 PNG (압축이 거의 안 됨)
+    side = max(16, int((kb * 1024) ** 0.5))
+    rng = random.Random(seed)
+    raw = b"".join(b"\x00" + rng.randbytes(side) for _ in range(side))
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", side, side, 8, 0, 0, 0, 0))
+                + chunk(b"IDAT", zlib.compress(raw, 1)) + chunk(b"IEND", b""))
+
+
+def make_image_document(work, paragraphs, images, image_kb):
+    path = make_document(os.path.join(work, "images.docx"), paragraphs, tables=1, rows=20, long_paragraphs=0)
+    doc = DB.docx.Document(path)
+    for i in range(images):
+        png = os.path.join(work, f"noise_{i}.png")
+        noise_png(png, image_kb, i)
+        doc.add_paragraph(f"그림 {i + 1}. 시험 결과 화면")
+        doc.add_picture(png)
+    doc.save(path)
+    return path
+
+
+def translated(path):
+    doc = DB.docx.Document(path)
+    parts = DB.story_parts(doc)
+    for task in DB.iter_tasks(DB.iter_segments(parts), None, DB.LifecycleManager()): DB.write_back(task, "translated text")
+    return doc, parts
+
+
+def measure(name, save, src, work, runs):
+    samples = []
+    for i in range(runs):
+        doc, parts = translated(src)
+        out = os.path.join(work, f"{name}_{i}.docx")
+        start = time.perf_counter()
+        save(doc, parts, out)
+        samples.append(time.perf_counter() - start)
+    result = {"median_sec": round(statistics.median(samples), 4), "min_sec": round(min(samples), 4),
+              "size_kb": round(os.path.getsize(out) / 1024), "paragraphs": len(DB.docx.Document(out).paragraphs)}
+    print(f"{name:>12}: {result['median_sec']:8.4f}s median  ({result['min_sec']:.4f}s min)  {result['size_kb']} KB")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=20)
+    parser.add_argument("--image-kb", type=int, default=2048, help="approximate size of each PNG")
+    parser.add_argument("--paragraphs", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    def full_save(doc, parts, out):
+        DB.store_story_parts(parts)
+        doc.save(out)
+
+    def passthrough(doc, parts, out):
+        DB.store_story_parts(parts)
+        DB.save_passthrough(src, out, parts)
+
+    with tempfile.TemporaryDirectory() as work:
+        src = make_image_document(work, args.paragraphs, args.images, args.image_kb)
+        print(f"document: {args.images} images x ~{args.image_kb} KB, {os.path.getsize(src) // 1024} KB on disk")
+        full = measure("doc.save", full_save, src, work, args.runs)
+        fast = measure("passthrough", passthrough, src, work, args.runs)
+    speedup = round(full["median_sec"] / fast["median_sec"], 1) if fast["median_sec"] else None
+    print(f"speedup: {speedup}x")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "doc_save": full, "passthrough": fast, "speedup": speedup}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# Cold-start timings, each measured in a fresh interpreter.
+#
+#   python benchmarks/bench_startup.py --runs 5 --output startup.json
+#
+# import             `import DocuBridge` (heavy dependencies are loaded lazily)
+# deferred_modules   importing translators / docx / requests / packaging - what startup used to pay up front
+# first_translation  interpreter start -> one-paragraph .docx translated through the headless CLI
+#                    against the mock Ollama server (local backend, TM off)
+# window             interpreter start -> GUI window drawn (skipped without a display)
+#
+# -X importtime output for the import step is summarised under "slowest_imports".
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from mock_ollama import MockOllamaServer
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = """
+import time; t0 = time.perf_counter()
+import DocuBridge
+print(time.perf_counter() - t0)
+"""
+
+DEFERRED_SNIPPET = """
+import time; t0 = time.perf_counter()
+import translators, docx, docx.shared, requests, packaging.version
+print(time.perf_counter() - t0)
+"""
+
+FIRST_TRANSLATION_SNIPPET = """
+import time; t0 = time.perf_counter()
+import sys, DocuBridge
+code = DocuBridge.main([sys.argv[1], "--quiet", "--json", sys.argv[2]])
+assert code == 0, code
+print(time.perf_counter() - t0)
+"""
+
+WINDOW_SNIPPET = """
+import time; t0 = time.perf_counter()
+import DocuBridge as DB
+DB.load_tkinter()
+root = DB.tk.Tk()
+app = DB.App(root)
+root.update()
+print(time.perf_counter() - t0)
+root.destroy()
+"""
+
+
+def run_child(snippet, cwd, *args):
+    env = {**os.environ, "PYTHONPATH": REPO, "translators_default_region": "EN"}
+    proc = subprocess.run([sys.executable, "-c", snippet, *args], cwd=cwd, env=env,
+                          capture_output=True, text=True, timeout=300)
+    if proc.returncode != 0: return None, proc.stderr.strip().splitlines()[-1:] or [""]
+    return float(proc.stdout.strip().splitlines()[-1]), None
+
+
+def measure(name, snippet, cwd, runs, *args):
+    samples = []
+    for _ in range(runs):
+        value, error = run_child(snippet, cwd, *args)
+        if value is None:
+            print(f"{name:>18}: skipped ({error[0]})")
+            return None
+        samples.append(value)
+    result = {"median_sec": round(statistics.median(samples), 3), "min_sec": round(min(samples), 3), "runs": runs}
+    print(f"{name:>18}: {result['median_sec']:.3f}s median  ({result['min_sec']:.3f}s min, {runs} runs)")
+    return result
+
+
+def slowest_imports(cwd, limit=10):
+    # -X importtime: "import time: self | cumulative | module" (stderr, microseconds)
+    env = {**os.environ, "PYTHONPATH": REPO, "translators_default_region": "EN"}
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import DocuBridge"], cwd=cwd, env=env,
+                          capture_output=True, text=True, timeout=300)
+    rows = []
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit(): continue
+        rows.append((int(parts[1]), parts[2].strip()))
+    rows.sort(reverse=True)
+    return [{"module": module, "cumulative_ms": round(us / 1000, 1)} for us, module in rows[:limit]]
+
+
+def make_docx(path):
+    import docx
+    doc = docx.Document()
+    doc.add_paragraph("본 계약은 서명일로부터 효력이 발생한다.")
+    doc.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    server = MockOllamaServer(latency=0.01).start()
+    report = {}
+    try:
+        with tempfile.TemporaryDirectory() as work:
+            # 작업 폴더의 config.json으로 mock 서버 / local 우선 / TM off 지정
+            with open(os.path.join(work, "config.json"), "w", encoding="utf-8") as f:
+                json.dump({"ollama_url": server.base_url, "backend_priority": "local", "tm_enabled": False}, f)
+            doc_path = os.path.join(work, "one.docx")
+            make_docx(doc_path)
+            report["import"] = measure("import", IMPORT_SNIPPET, work, args.runs)
+            report["deferred_modules"] = measure("deferred_modules", DEFERRED_SNIPPET, work, args.runs)
+            report["first_translation"] = measure("first_translation", FIRST_TRANSLATION_SNIPPET, work, args.runs,
+                                                  doc_path, os.path.join(work, "summary.json"))
+            report["window"] = measure("window", WINDOW_SNIPPET, work, args.runs)
+            report["slowest_imports"] = slowest_imports(work)
+    finally:
+        server.stop()
+    for row in report["slowest_imports"][:5]:
+        print(f"{'':>18}  {row['cumulative_ms']:8.1f}ms  {row['module']}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
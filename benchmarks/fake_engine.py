@@ -0,0 +1,37 @@
+# Stand-in for the `translators` package: latency with jitter (plus an optional per-character cost, since
+# real engines take longer on long inputs) and a configurable failure rate.
+# Install with `DocuBridge.ts = FakeTranslators(...)` - OnlineBackend only calls ts.translate_text.
+import random
+import threading
+import time
+
+
+class FakeTranslators:
+    def __init__(self, latency=0.05, jitter=0.5, failure_rate=0.0, seed=7, per_char=0.0):
+        self.latency = latency
+        self.per_char = per_char        # 입력 글자당 추가 지연 (s)
+        self.jitter = jitter            # latency * (1 ± jitter) 범위에서 균등 분포
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.calls = {}
+        self.failures = 0
+        self.lock = threading.Lock()
+
+    def translate_text(self, text, translator="google", from_language="auto", to_language="en", timeout=None, **kwargs):
+        with self.lock:
+            self.calls[translator] = self.calls.get(translator, 0) + 1
+            delay = (self.latency + self.per_char * len(text)) * (1 + self.rng.uniform(-self.jitter, self.jitter))
+            fail = self.rng.random() < self.failure_rate
+        time.sleep(delay)
+        if fail:
+            with self.lock: self.failures += 1
+            raise RuntimeError(f"{translator}: simulated failure")
+        # 배치 요청의 "[n] " 번호는 그대로 두고 줄 단위로 번역 흉내
+        return "\n".join(self.translate_line(line) for line in text.split("\n"))
+
+    @staticmethod
+    def translate_line(line):
+        if line.startswith("[") and "] " in line:
+            marker, body = line.split("] ", 1)
+            return f"{marker}] EN<{body}>"
+        return f"EN<{line}>"
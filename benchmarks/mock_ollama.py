@@ -0,0 +1,94 @@
+# Local stand-in for the Ollama HTTP API used by the benchmarks.
+# Implements GET /, GET /api/tags, POST /api/generate and POST /api/chat with a fixed artificial latency.
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_translate(text):
+    return f"EN<{text}>"
+
+
+class MockOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive 허용
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, data, status=200):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self.send_json({"models": [{"name": name} for name in self.server.models]})
+        else:
+            body = b"Ollama is running"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if self.path not in ("/api/generate", "/api/chat"):
+            return self.send_json({"error": "not found"}, status=404)
+        if self.path == "/api/generate" and not payload.get("prompt"):
+            # 빈 프롬프트 = 모델 preload
+            return self.send_json({"model": payload.get("model"), "response": "", "done": True, "done_reason": "load"})
+        self.server.count_request()
+        time.sleep(self.server.latency)
+        if self.path == "/api/chat":
+            text = payload["messages"][-1]["content"]
+        else:
+            prompt = payload.get("prompt", "")
+            match = re.search(r"Korean: (.*)\nEnglish:", prompt, re.S)
+            text = match.group(1) if match else prompt
+        if payload.get("format") == "json":
+            items = json.loads(text[text.index("["):])
+            output = json.dumps({"translations": [fake_translate(t) for t in items]}, ensure_ascii=False)
+        else:
+            output = fake_translate(text)
+        latency_ns = int(self.server.latency * 1e9)
+        data = {"model": payload.get("model"), "done": True, "done_reason": "stop",
+                "load_duration": 0, "prompt_eval_count": len(text), "prompt_eval_duration": latency_ns // 4,
+                "eval_count": len(output), "eval_duration": latency_ns - latency_ns // 4}
+        if self.path == "/api/chat": data["message"] = {"role": "assistant", "content": output}
+        else: data["response"] = output
+        self.send_json(data)
+
+
+class MockOllamaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency=0.05, models=("qwen2.5:1.5b",), port=0):
+        super().__init__(("127.0.0.1", port), MockOllamaHandler)
+        self.latency = latency
+        self.models = list(models)
+        self.requests = 0
+        self._count_lock = threading.Lock()
+        self._thread = None
+
+    def count_request(self):
+        with self._count_lock:
+            self.requests += 1
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
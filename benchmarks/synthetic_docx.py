@@ -0,0 +1,58 @@
+# Synthetic Korean .docx documents for the benchmarks.
+# Body paragraphs (bullets, numbered clauses), large tables with merged cells and long multi-sentence paragraphs,
+# optionally a header/footer and tables nested inside cells.
+import random
+
+from docx import Document
+
+SUBJECTS = ["본 계약", "갑", "을", "수급인", "발주처", "당사자", "위탁자", "관리자"]
+OBJECTS = ["계약 이행", "대금 지급", "비밀 유지", "손해 배상", "하자 보수", "납품 일정", "검수 절차", "지식재산권"]
+ENDINGS = ["에 관한 사항을 성실히 이행하여야 한다.", "을 서면으로 통지한다.", "에 대하여 책임을 진다.",
+           "은 별도 협의에 따른다.", "을 지체 없이 보고하여야 한다."]
+BULLETS = ["가.", "나.", "다.", "라.", "①", "②", "③", "1)", "-"]
+
+
+def sentence(rng):
+    return f"{rng.choice(SUBJECTS)}은 {rng.choice(OBJECTS)}{rng.choice(ENDINGS)}"
+
+
+def paragraph_text(rng, index, sentences=1):
+    bullet = rng.choice(BULLETS)
+    body = " ".join(sentence(rng) for _ in range(sentences))
+    return f"{bullet} 제{index}조 {body}"
+
+
+def make_document(path, paragraphs=300, tables=2, rows=30, cols=4, long_paragraphs=10, long_sentences=12, seed=7,
+                  header=False, nested_every=0):
+    rng = random.Random(seed)
+    doc = Document()
+    if header:
+        doc.sections[0].header.paragraphs[0].text = "대외비 - 용역 계약서"
+        doc.sections[0].footer.paragraphs[0].text = "본 문서의 무단 배포를 금한다."
+    doc.add_heading("용역 계약서", level=1)
+    for i in range(paragraphs):
+        doc.add_paragraph(paragraph_text(rng, i + 1, rng.choice([1, 1, 1, 2, 3])))
+        if long_paragraphs and i % max(1, paragraphs // long_paragraphs) == 0:
+            doc.add_paragraph(paragraph_text(rng, i + 1, long_sentences))
+    doc.add_paragraph("English only paragraph (no translation needed)")
+    for t in range(tables):
+        table = doc.add_table(rows=rows, cols=cols)
+        for r, row in enumerate(table.rows):
+            for c, cell in enumerate(row.cells):
+                cell.text = f"{rng.choice(OBJECTS)} {t}-{r}-{c}" if r else f"항목 {c}"
+        # 가로 / 세로 병합 셀 (같은 XML 요소를 여러 셀이 공유)
+        for r in range(1, rows - 1, 5):
+            table.cell(r, 0).merge(table.cell(r, 1))
+            table.cell(r, cols - 1).merge(table.cell(r + 1, cols - 1))
+        # 셀 안의 표 (nested_every 행마다 한 개)
+        for r in (range(1, rows, nested_every) if nested_every else []):
+            inner = table.cell(r, 1).add_table(rows=2, cols=2)
+            for row in inner.rows:
+                for cell in row.cells: cell.text = f"{rng.choice(OBJECTS)} 세부 {t}-{r}"
+    doc.save(path)
+    return path
+
+
+if __name__ == "__main__":
+    import sys
+    print(make_document(sys.argv[1] if len(sys.argv) > 1 else "synthetic.docx"))